@@ -1,6 +1,7 @@
 from beanie import Document
 from pydantic import Field
 from typing import Optional
+from pymongo import ASCENDING, DESCENDING, IndexModel
 import time
 
 
@@ -8,13 +9,20 @@ import time
 ############### Models that directly access the database and stored all the keys ######################################
 
 class APIKey(Document):
-    key: str = Field(..., unique=True, index=True)
+    # sha256 digest of the issued key; the plaintext key is only returned once at creation
+    key_hash: bytes
     name: str
     is_active: bool = True
-    created_at: int = Field(default_factory=lambda: int(time.time()))
+    created_at: int = Field(default_factory=lambda: time.time_ns() // 1_000_000_000)
     last_used: Optional[int] = None
     
     class Settings:
         name = "api_keys"
+        indexes = [
+            IndexModel([("key_hash", ASCENDING)], name="key_hash_unique", unique=True),
+            # matches the validate_api_key predicate (key_hash == ? AND is_active == True)
+            IndexModel([("key_hash", ASCENDING), ("is_active", ASCENDING)], name="key_hash_is_active"),
+            IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+        ]
         
 ##########################################################################################################
\ No newline at end of file
@@ -1,8 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from typing import List
-from .schemas import APIKeyCreate, APIKeyResponse, APIKeyList
-from .services import create_api_key, validate_api_key, get_all_api_keys, deactivate_api_key
+from .schemas import APIKeyCreate, APIKeyBulkCreate, APIKeyResponse, APIKeyList
+from .services import create_api_key, create_api_keys_bulk, validate_api_key, get_all_api_keys, deactivate_api_key
 
 ########################################################################################
 
@@ -51,22 +51,28 @@ async def create_new_api_key(api_key_data: APIKeyCreate):
     return await create_api_key(api_key_data)
 
 
+#####################################################################################################################
+################## Post API that creates several API keys in one request ##########################################
+
+@auth_router.post("/api-keys/bulk", response_model=List[APIKeyResponse])
+async def create_new_api_keys_bulk(
+    api_keys_data: APIKeyBulkCreate,
+    current_key = Depends(get_current_api_key)
+):
+    """Create several API keys at once (protected endpoint)"""
+    return await create_api_keys_bulk(api_keys_data.names)
+
 #####################################################################################################################
 ############## get API to access the all the apis that is present till now ##############################################
 
 @auth_router.get("/api-keys", response_model=List[APIKeyList])
-async def list_api_keys(current_key = Depends(get_current_api_key)):
-    """List all API keys (protected endpoint)"""
-    keys = await get_all_api_keys()
-    return [
-        APIKeyList(
-            id=str(key.id),
-            name=key.name,
-            is_active=key.is_active,
-            created_at=key.created_at,
-            last_used=key.last_used
-        ) for key in keys
-    ]
+async def list_api_keys(
+    skip: int = Query(0, ge=0, description="Number of keys to skip"),
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of keys to return"),
+    current_key = Depends(get_current_api_key)
+):
+    """List API keys, newest first (protected endpoint)"""
+    return await get_all_api_keys(skip=skip, limit=limit)
 
 ###################################################################################################################
 ################ The delete api this will deactivate the api key when not in use ##################################
@@ -86,8 +92,7 @@ async def delete_api_key(key_id: str, current_key = Depends(get_current_api_key)
 # Custom dependency for docs authentication
 ########## this is validate the api key #################################
 
-async def docs_auth_dependency(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Special dependency for docs authentication"""
-    return await get_current_api_key(credentials)
+# Same dependency as get_current_api_key; kept as a separate name for the docs endpoints
+docs_auth_dependency = get_current_api_key
 
 #####################################################################################################################
\ No newline at end of file
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import AliasChoices, BaseModel, Field, field_validator
+from typing import List, Optional
 
 
 ########################################################################################################
@@ -8,6 +8,9 @@ from typing import Optional
 class APIKeyCreate(BaseModel):
     name: str
 
+class APIKeyBulkCreate(BaseModel):
+    names: List[str] = Field(..., min_length=1, max_length=100)
+
 class APIKeyResponse(BaseModel):
     id: str
     key: str
@@ -16,11 +19,20 @@ class APIKeyResponse(BaseModel):
     created_at: int
     last_used: Optional[int] = None
 
+# Also used as the Beanie projection when listing keys, so key_hash never leaves the database
 class APIKeyList(BaseModel):
-    id: str
+    id: str = Field(validation_alias=AliasChoices("_id", "id"))
     name: str
     is_active: bool
     created_at: int
     last_used: Optional[int] = None
+
+    @field_validator('id', mode='before')
+    def stringify_id(cls, v):
+        """Documents come back with an ObjectId _id"""
+        return str(v)
+
+    class Settings:
+        projection = {"_id": 1, "name": 1, "is_active": 1, "created_at": 1, "last_used": 1}
     
 ###################################################################################################################
\ No newline at end of file
@@ -1,10 +1,46 @@
+import hashlib
+import os
 import secrets
 import time
-from typing import Optional
+from typing import List, Optional
+from cachetools import TTLCache
+from pymongo import UpdateOne
 from .models import APIKey
-from .schemas import APIKeyCreate, APIKeyResponse
+from .schemas import APIKeyCreate, APIKeyList, APIKeyResponse
 
 
+############################################################################################################################
+############# Process-local cache of validated keys, keyed by sha256 of the bearer token ###################################
+
+_key_cache: TTLCache = TTLCache(maxsize=10000, ttl=int(os.getenv("API_KEY_CACHE_TTL", "30")))
+
+# last_used is only persisted when the stored value is older than this many seconds
+LAST_USED_WRITE_INTERVAL = 30
+
+
+def hash_api_key(api_key: str) -> bytes:
+    """Return the sha256 digest under which an API key is stored"""
+    return hashlib.sha256(api_key.encode()).digest()
+
+
+############################################################################################################################
+############# One-off migration of keys stored before key_hash existed #####################################################
+
+async def migrate_plaintext_api_keys(collection) -> int:
+    """Replace plaintext `key` fields with their key_hash; run before the key_hash indexes are built"""
+    updates = [
+        UpdateOne(
+            {"_id": doc["_id"]},
+            {"$set": {"key_hash": hash_api_key(doc["key"])}, "$unset": {"key": ""}}
+        )
+        async for doc in collection.find(
+            {"key_hash": {"$exists": False}, "key": {"$exists": True}}, {"key": 1}
+        )
+    ]
+    if updates:
+        await collection.bulk_write(updates, ordered=False)
+    return len(updates)
+
 
 ############################################################################################################################
 ############# This will create a new api key ###############################################################################
@@ -15,42 +51,82 @@ async def create_api_key(api_key_data: APIKeyCreate) -> APIKeyResponse:
     key = f"sk-{secrets.token_urlsafe(32)}"
     
     api_key = APIKey(
-        key=key,
+        key_hash=hash_api_key(key),
         name=api_key_data.name,
-        created_at=int(time.time())
+        created_at=time.time_ns() // 1_000_000_000
     )
     
     await api_key.insert()
     
     return APIKeyResponse(
         id=str(api_key.id),
-        key=api_key.key,
+        key=key,
         name=api_key.name,
         is_active=api_key.is_active,
         created_at=api_key.created_at,
         last_used=api_key.last_used
     )
 
+################################################################################################################################
+############# This will create many api keys with a single insert ##############################################################
+
+async def create_api_keys_bulk(names: List[str]) -> List[APIKeyResponse]:
+    """Create several API keys with one insert_many round-trip"""
+    now = time.time_ns() // 1_000_000_000
+    keys = [f"sk-{secrets.token_urlsafe(32)}" for _ in names]
+    
+    docs = [
+        APIKey(key_hash=hash_api_key(key), name=name, created_at=now)
+        for key, name in zip(keys, names)
+    ]
+    
+    result = await APIKey.insert_many(docs)
+    
+    return [
+        APIKeyResponse(
+            id=str(inserted_id),
+            key=key,
+            name=doc.name,
+            is_active=doc.is_active,
+            created_at=doc.created_at,
+            last_used=doc.last_used
+        ) for inserted_id, key, doc in zip(result.inserted_ids, keys, docs)
+    ]
+
 ################################################################################################################################
 ################### This function is used to update the API key and update the last used timestamps ############################
 
 async def validate_api_key(api_key: str) -> Optional[APIKey]:
     """Validate API key and update last_used timestamp"""
-    key_doc = await APIKey.find_one(APIKey.key == api_key, APIKey.is_active == True)
+    key_hash = hash_api_key(api_key)
+    
+    key_doc = _key_cache.get(key_hash)
+    if key_doc is None:
+        key_doc = await APIKey.find_one(APIKey.key_hash == key_hash, APIKey.is_active == True)
+        if not key_doc:
+            return None
+        _key_cache[key_hash] = key_doc
     
-    if key_doc:
-        # Update last used timestamp
-        key_doc.last_used = int(time.time())
-        await key_doc.save()
+    # Update last used timestamp (debounced so cache hits stay off the database)
+    now = time.time_ns() // 1_000_000_000
+    if key_doc.last_used is None or now - key_doc.last_used > LAST_USED_WRITE_INTERVAL:
+        await key_doc.set({APIKey.last_used: now})
         
     return key_doc
 
 #########################################################################################################################################
 ############## This function will fetch all the api keys that is present ################################################################
 
-async def get_all_api_keys():
-    """Get all API keys (without exposing the actual key)"""
-    keys = await APIKey.find_all().to_list()
+async def get_all_api_keys(skip: int = 0, limit: int = 100) -> List[APIKeyList]:
+    """Get a page of API keys, newest first (without exposing the actual key)"""
+    keys = await (
+        APIKey.find_all()
+        .sort(-APIKey.created_at)
+        .skip(skip)
+        .limit(limit)
+        .project(APIKeyList)
+        .to_list()
+    )
     return keys
 
 ########################################################################################################################################
@@ -60,8 +136,10 @@ async def deactivate_api_key(key_id: str) -> bool:
     """Deactivate an API key"""
     api_key = await APIKey.get(key_id)
     if api_key:
-        api_key.is_active = False
-        await api_key.save()
+        await api_key.set({APIKey.is_active: False})
+        
+        # Evict the cached key so revocation takes effect immediately in this process
+        _key_cache.pop(api_key.key_hash, None)
         return True
     return False
 
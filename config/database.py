@@ -1,20 +1,33 @@
 import motor.motor_asyncio
 from beanie import init_beanie
 from task_management.models import Tasks
-from user_auth.models import OTPStore, PhoneVerification, Users
+from user_auth.models import OTPRateLimit, OTPStore, PhoneVerification, Users
 from .settings import settings
 from auth.models import APIKey
+from auth.services import migrate_plaintext_api_keys
 
 
 #########################################################################################################
 ####### Database files that have an use of beanie ODM use ################################################
 
 # MongoDB client
-client = motor.motor_asyncio.AsyncIOMotorClient(settings.mongodb_url)
+client = motor.motor_asyncio.AsyncIOMotorClient(
+    settings.mongodb_url,
+    minPoolSize=settings.mongodb_min_pool_size,
+    maxPoolSize=settings.mongodb_max_pool_size,
+    waitQueueTimeoutMS=settings.mongodb_wait_queue_timeout_ms,  # fail fast instead of queueing forever when the pool is exhausted
+    maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+    serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+    compressors=settings.mongodb_compressors,  # zlib is built in; zstd and snappy need extra packages
+)
 database = client[settings.database_name]
 
 async def init_db():
     """Initialize database with Beanie"""
-    await init_beanie(database=database, document_models=[APIKey,Users,OTPStore,PhoneVerification,Tasks])
+    # Open a connection up front so the first request does not pay for server selection and handshake
+    await database.command("ping")
+    # Legacy keys have no key_hash and would collide as nulls in the unique key_hash index
+    await migrate_plaintext_api_keys(database[APIKey.Settings.name])
+    await init_beanie(database=database, document_models=[APIKey,Users,OTPStore,OTPRateLimit,PhoneVerification,Tasks])
 
 ###############################################################################################################
\ No newline at end of file
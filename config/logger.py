@@ -0,0 +1,44 @@
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+
+##############################################################################################################
+############# Logging through a queue, so request code never waits on stdout ##################################
+
+"""
+Loggers only put records on an in-memory queue; a QueueListener thread formats them and
+writes them to stdout. Started and stopped from the FastAPI lifespan in main.py.
+"""
+
+_listener: Optional[QueueListener] = None
+
+
+def start_logging(level: int = logging.INFO) -> None:
+    """Route the root logger through a queue drained by a background thread"""
+    global _listener
+    if _listener is not None:
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    root = logging.getLogger()
+    root.handlers = [QueueHandler(log_queue)]
+    root.setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+##############################################################################################################
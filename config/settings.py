@@ -3,6 +3,21 @@ from pydantic_settings import BaseSettings
 
 
 
+##################################################################################################################################
+################## Resolve the dotenv file for the current ENV once at import ###################################################
+
+_ENV_FILES = {
+    'PRODUCTION': '.env.production',
+    'STAGE': '.env.stage',
+    'LOCAL': '.env.local',
+}
+
+
+def _env_file():
+    """Return the dotenv file for the ENV environment variable, or None to read the process environment only"""
+    return _ENV_FILES.get(os.getenv("ENV"))
+
+
 ##################################################################################################################################
 ################## This is settings all the main credentials that we used will use by here #######################################
 
@@ -11,24 +26,24 @@ class Settings(BaseSettings):
     database_name: str 
     secret_key: str
     
+    # MongoDB connection pool tuning
+    mongodb_min_pool_size: int = 5
+    mongodb_max_pool_size: int = 50
+    mongodb_wait_queue_timeout_ms: int = 2000
+    mongodb_max_idle_time_ms: int = 60000
+    mongodb_server_selection_timeout_ms: int = 3000
+    mongodb_compressors: str = "zlib"  # zstd/snappy need the zstandard/python-snappy packages
+    
+    # Comma separated list of allowed CORS origins ("*" allows any origin, without credentials)
+    cors_allow_origins: str = "*"
+    
     # Twilio SMS Configuration
     twilio_account_sid: str
     twilio_auth_token: str
     twilio_phone_number: str
     
     class Config:
-        ENV = os.getenv("ENV")
-        print(f"{ENV=}")
-        if ENV == 'PRODUCTION':
-            dotenv_file = '.env.production'
-        elif ENV == 'STAGE':
-            dotenv_file = '.env.stage'
-        elif ENV == 'LOCAL':
-            dotenv_file = '.env.local'
-        else:
-            print("ENVIRONMENT SETTINGS NOT FOUND")
-            
-        env_file = dotenv_file
+        env_file = _env_file()
 
 settings = Settings()
 
@@ -1,14 +1,23 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query
+from fastapi import FastAPI, Cookie, Depends, HTTPException, status, Query
 from fastapi.openapi.utils import get_openapi
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse, Response
 from contextlib import asynccontextmanager
+from typing import Optional
+import hashlib
+import hmac
+import html
+import os
+import time
 from config.database import init_db
+from config.logger import start_logging, stop_logging
+from config.settings import settings
 from auth.routers import auth_router, docs_auth_dependency
 from auth.services import validate_api_key
 import uvicorn
 from user_auth.routers import user_auth_router
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from task_management.routers import task_router
 
 ####################################################################################################################
@@ -26,6 +35,7 @@ async def lifespan(app: FastAPI):
     This replaces the deprecated @app.on_event("startup") and @app.on_event("shutdown")
     """
     # Startup events
+    start_logging()
     await init_db()
     print("Database initialized with Beanie ODM")
     
@@ -33,6 +43,7 @@ async def lifespan(app: FastAPI):
     
     # Shutdown events (if needed)
     print("Application shutting down...")
+    stop_logging()
 
 ##############################################################################################################################
 
@@ -43,7 +54,9 @@ app = FastAPI(
     description="Fast APi for the Task Manager by which any one can manage there tasks and lot a task to another person",
     docs_url=None,  # Disable default docs
     redoc_url=None,  # Disable default redoc
+    openapi_url=None,  # the token-checked /openapi.json route below serves the schema
     lifespan=lifespan, 
+    default_response_class=ORJSONResponse,
     contact={
         "name": "Khushi Shrivastava",
         "email": "shrivastavakhushi419@gmail.com",
@@ -63,16 +76,22 @@ security = HTTPBearer(auto_error=False)
 ############ CORSMiddleware ######################################################################  
 
 
+cors_allow_origins = [origin.strip() for origin in settings.cors_allow_origins.split(",") if origin.strip()]
+
+# Browsers reject credentialed responses with a wildcard origin, so credentials are only allowed for explicit origins
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "*"
-    ],
-    allow_credentials=True,
+    allow_origins=cors_allow_origins,
+    allow_credentials="*" not in cors_allow_origins,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+##################################################################################################
+############ GZipMiddleware (large JSON such as /openapi.json and list endpoints) ################
+
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 ############################################################################################################
 ###################### Include auth router #################################################################
 
@@ -81,25 +100,10 @@ app.include_router(user_auth_router)
 app.include_router(task_router)
 
 ##############################################################################################################
-#################### Custom docs with built-in authentication form ###########################################
+#################### Static HTML for the docs pages, built once at import #####################################
 
-@app.get("/docs", include_in_schema=False)
-async def custom_swagger_ui_html(
-    token: str = Query(None),
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    """Protected Swagger UI docs with authentication form"""
-    
-    # Check if token is provided in query parameter
-    api_key = None
-    if token:
-        api_key = token
-    elif credentials:
-        api_key = credentials.credentials
-    
-    # If no API key provided, show login form
-    if not api_key:
-        return HTMLResponse(content="""
+# Login form shown when /docs is opened without an API key
+_LOGIN_HTML: bytes = """
             <!DOCTYPE html>
             <html>
             <head>
@@ -189,48 +193,22 @@ async def custom_swagger_ui_html(
                 </script>
             </body>
             </html>
-                    """)
-    
-    # Validate the provided API key
-    key_doc = await validate_api_key(api_key)
-    
-    if not key_doc:
-        # If invalid API key, redirect back to login form
-        return HTMLResponse(content="""
+""".encode()
+
+_INVALID_KEY_HTML: bytes = """
         <script>
             alert('Invalid or expired API key. Redirecting to login...');
             window.location.href = '/docs';
         </script>
-        """)
-    
-    # Redirect to proper swagger docs with token
-    return HTMLResponse(content=f"""
+""".encode()
+
+_DOCS_REDIRECT_TEMPLATE = """
     <script>
-        window.location.replace('/swagger-docs?token={api_key}');
+        window.location.replace('/swagger-docs?token={token}');
     </script>
-    """)
-
-##############################################################################################################
-############# docs with token ################################################################################
+"""
 
-@app.get("/swagger-docs", include_in_schema=False)
-async def swagger_docs_with_token(token: str):
-    """Swagger UI docs with token authentication"""
-    
-    # Validate the API key
-    key_doc = await validate_api_key(token)
-    
-    if not key_doc:
-        return HTMLResponse(content="""
-        <script>
-            alert('Invalid or expired API key. Redirecting to login...');
-            window.location.href = '/docs';
-        </script>
-        """)
-    
-    # Return custom HTML with working Swagger UI
-    return HTMLResponse(
-    content=f"""
+_SWAGGER_TEMPLATE = """
         <!DOCTYPE html>
         <html lang="en">
         <head>
@@ -238,18 +216,18 @@ async def swagger_docs_with_token(token: str):
             <title>API Documentation</title>
             <link rel="stylesheet" type="text/css" href="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0/swagger-ui.css" />
             <style>
-                html {{
+                html {
                     box-sizing: border-box;
                     overflow: -moz-scrollbars-vertical;
                     overflow-y: scroll;
-                }}
-                *, *:before, *:after {{
+                }
+                *, *:before, *:after {
                     box-sizing: inherit;
-                }}
-                body {{
+                }
+                body {
                     margin:0;
                     background: #fafafa;
-                }}
+                }
             </style>
         </head>
         <body>
@@ -257,8 +235,8 @@ async def swagger_docs_with_token(token: str):
             <script src="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0/swagger-ui-bundle.js"></script>
             <script src="https://cdn.jsdelivr.net/npm/swagger-ui-dist@5.9.0/swagger-ui-standalone-preset.js"></script>
             <script>
-                window.onload = function() {{
-                    const ui = SwaggerUIBundle({{
+                window.onload = function() {
+                    const ui = SwaggerUIBundle({
                         url: '/openapi.json?token={token}',
                         dom_id: '#swagger-ui',
                         deepLinking: true,
@@ -273,43 +251,169 @@ async def swagger_docs_with_token(token: str):
                         persistAuthorization: true,
                         displayRequestDuration: true,
                         filter: true,
-                        requestInterceptor: function(request) {{
+                        requestInterceptor: function(request) {
                             // Add the API key to all requests
                             request.headers['Authorization'] = 'Bearer {token}';
                             return request;
-                        }},
-                        onComplete: function() {{
+                        },
+                        onComplete: function() {
                             console.log('Swagger UI loaded successfully');
-                        }}
-                    }});
+                        }
+                    });
                     
                     window.ui = ui;
-                }};
+                };
             </script>
         </body>
         </html>
-    """)
+"""
+
+
+def _render_with_token(template: str, token: str) -> str:
+    """Substitute the (HTML-escaped) API key into a pre-built page template"""
+    return template.replace("{token}", html.escape(token))
+
+##############################################################################################################
+#################### Signed cookie that lets the docs pages skip re-validating the API key ###################
+
+"""
+After the key has been validated once, /docs and /swagger-docs set a short-lived cookie holding
+HMAC(secret_key, "<api_key>:<expires_at>"). Swagger UI's follow-up requests carry the same token in the
+query string, so the cookie can be checked in memory instead of looking the key up again.
+A key revoked while the cookie is live keeps docs access until the cookie expires.
+"""
+
+DOCS_COOKIE_NAME = "docs_auth"
+DOCS_COOKIE_MAX_AGE = 600  # seconds
+
+
+def _sign_docs_token(token: str, expires_at: int) -> str:
+    """Build the cookie value for a token and expiry"""
+    digest = hmac.new(
+        settings.secret_key.encode(), f"{token}:{expires_at}".encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{expires_at}:{digest}"
+
+
+def _docs_cookie_is_valid(token: Optional[str], cookie: Optional[str]) -> bool:
+    """Check that the cookie was issued for this token and has not expired"""
+    if not token or not cookie:
+        return False
+    
+    # isdigit() alone also accepts non-ASCII digits such as "²", which int() rejects
+    expires_at, _, _ = cookie.partition(":")
+    if not (expires_at.isascii() and expires_at.isdigit()) or int(expires_at) < int(time.time()):
+        return False
+    
+    # compared as bytes: compare_digest raises TypeError on non-ASCII str
+    expected = _sign_docs_token(token, int(expires_at))
+    return hmac.compare_digest(expected.encode(), cookie.encode("utf-8", "surrogateescape"))
+
+
+def _set_docs_cookie(response: Response, token: str) -> Response:
+    """Attach a fresh signed docs cookie to the response"""
+    expires_at = int(time.time()) + DOCS_COOKIE_MAX_AGE
+    response.set_cookie(
+        DOCS_COOKIE_NAME,
+        _sign_docs_token(token, expires_at),
+        max_age=DOCS_COOKIE_MAX_AGE,
+        httponly=True,
+        samesite="lax",
+    )
+    return response
+
+##############################################################################################################
+#################### Custom docs with built-in authentication form ###########################################
+
+@app.get("/docs", include_in_schema=False)
+async def custom_swagger_ui_html(
+    token: str = Query(None),
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Protected Swagger UI docs with authentication form"""
+    
+    # Check if token is provided in query parameter
+    api_key = None
+    if token:
+        api_key = token
+    elif credentials:
+        api_key = credentials.credentials
+    
+    # If no API key provided, show login form
+    if not api_key:
+        return Response(content=_LOGIN_HTML, media_type="text/html")
+    
+    # Validate the provided API key
+    key_doc = await validate_api_key(api_key)
+    
+    if not key_doc:
+        # If invalid API key, redirect back to login form
+        return Response(content=_INVALID_KEY_HTML, media_type="text/html")
+    
+    # Redirect to proper swagger docs with token
+    response = HTMLResponse(content=_render_with_token(_DOCS_REDIRECT_TEMPLATE, api_key))
+    return _set_docs_cookie(response, api_key)
+
+##############################################################################################################
+############# docs with token ################################################################################
+
+@app.get("/swagger-docs", include_in_schema=False)
+async def swagger_docs_with_token(
+    token: str,
+    docs_auth: Optional[str] = Cookie(None)
+):
+    """Swagger UI docs with token authentication"""
+    
+    # Return custom HTML with working Swagger UI
+    response = HTMLResponse(content=_render_with_token(_SWAGGER_TEMPLATE, token))
+    
+    if _docs_cookie_is_valid(token, docs_auth):
+        return response
+    
+    # Validate the API key
+    key_doc = await validate_api_key(token)
+    
+    if not key_doc:
+        return Response(content=_INVALID_KEY_HTML, media_type="text/html")
+    
+    return _set_docs_cookie(response, token)
 
 ####################################################################################################################
 # Simplified OpenAPI endpoint with better error handling
 
+_openapi_cache: Optional[dict] = None
+
 @app.get("/openapi.json", include_in_schema=False)
-async def get_open_api_endpoint(token: str = Query(None)):
+async def get_open_api_endpoint(
+    token: str = Query(None),
+    docs_auth: Optional[str] = Cookie(None)
+):
     """Protected OpenAPI schema"""
     
-    # Validate token if provided
-    if token:
-        key_doc = await validate_api_key(token)
-        if not key_doc:
+    # A valid signed docs cookie for this token skips the API key lookup
+    if not _docs_cookie_is_valid(token, docs_auth):
+        # Validate token if provided
+        if token:
+            key_doc = await validate_api_key(token)
+            if not key_doc:
+                raise HTTPException(
+                    status_code=status.HTTP_401_UNAUTHORIZED,
+                    detail="Invalid API key"
+                )
+        else:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid API key"
+                detail="API key required"
             )
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="API key required"
-        )
+    
+    return build_openapi_schema()
+
+
+def build_openapi_schema() -> dict:
+    """Generate the OpenAPI schema once; routes do not change after startup"""
+    global _openapi_cache
+    if _openapi_cache is not None:
+        return _openapi_cache
     
     # Generate OpenAPI schema
     openapi_schema = get_openapi(
@@ -336,7 +440,8 @@ async def get_open_api_endpoint(token: str = Query(None)):
     # Add global security requirement
     openapi_schema["security"] = [{"HTTPBearer": []}]
     
-    return openapi_schema
+    _openapi_cache = openapi_schema
+    return _openapi_cache
 
 ##################################################################################################################
 # Example protected endpoint
@@ -379,6 +484,15 @@ async def health_check():
 ############# Start the backend fastAPI server #####################################################################################
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    # reload is only for local development; uvicorn ignores workers when reload is on
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        reload=os.getenv("ENV") == "LOCAL",
+    )
     
 #####################################################################################################################################
\ No newline at end of file
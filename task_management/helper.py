@@ -1,15 +1,38 @@
 
+import re
+import time
 from datetime import datetime
+from functools import lru_cache
+from bson import ObjectId
+from user_auth.helper import active_user_cache
 from user_auth.models import Users
+from user_auth.schemas import UserIdOnly
 
 
+# [epoch seconds, monotonic time it was read at]
+_CACHED_EPOCH = [0, 0.0]
+
+
+# Helper function returning the current epoch second, re-reading the wall clock at most every 0.5s
+def now_epoch() -> int:
+    """Current epoch seconds from a process-wide cache refreshed every 500 ms"""
+    t = time.monotonic()
+    if t - _CACHED_EPOCH[1] > 0.5:
+        _CACHED_EPOCH[:] = [int(time.time()), t]
+    return _CACHED_EPOCH[0]
+
+
+@lru_cache(maxsize=4096)
+def _format_epoch(epoch_time: int) -> str:
+    """Memoized formatting; list views render many tasks sharing the same timestamps"""
+    return datetime.fromtimestamp(epoch_time).strftime('%Y-%m-%d %H:%M:%S')
+
 
 # Helper function to convert epoch to human readable format
 def epoch_to_human_time(epoch_time: int) -> str:
     """Convert epoch timestamp to human readable format"""
     try:
-        dt = datetime.fromtimestamp(epoch_time)
-        return dt.strftime('%Y-%m-%d %H:%M:%S')
+        return _format_epoch(epoch_time)
     except Exception:
         return "Invalid timestamp"
 
@@ -17,36 +40,47 @@ def epoch_to_human_time(epoch_time: int) -> str:
 # Helper function to validate if user exists and is active
 async def validate_user_exists(user_id: str) -> bool:
     """Check if user exists and is active"""
-    try:
-        user = await Users.get(user_id)
-        return user is not None and user.is_active
-    except:
+    if user_id in active_user_cache:
+        return True
+    # malformed ids are rejected before any round-trip, without catching exceptions
+    if not ObjectId.is_valid(user_id):
         return False
+    user = await Users.find_one(
+        Users.id == ObjectId(user_id), Users.is_active == True
+    ).project(UserIdOnly)
+    # only positive answers are cached, so unknown ids cannot fill the cache
+    if user is not None:
+        active_user_cache[user_id] = True
+    return user is not None
     
     
+# YYYY-MM-DD or DD-MM-YYYY, optionally followed by HH:MM or HH:MM:SS
+_YEAR_FIRST_RE = re.compile(r'^(\d{4})-(\d{1,2})-(\d{1,2})(?:[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?$')
+_DAY_FIRST_RE = re.compile(r'^(\d{1,2})-(\d{1,2})-(\d{4})(?:[ T](\d{1,2}):(\d{1,2})(?::(\d{1,2}))?)?$')
+
+
 # Helper function to convert human readable time to epoch
+@lru_cache(maxsize=4096)
 def human_time_to_epoch(human_time: str) -> int:
     """Convert human readable time to epoch timestamp
     Supports formats: 'YYYY-MM-DD HH:MM:SS', 'YYYY-MM-DD HH:MM', 'YYYY-MM-DD'
+    and the same with a DD-MM-YYYY date
     """
-    try:
-        # Try different datetime formats
-        formats = [
-            '%Y-%m-%d %H:%M:%S',  # 2024-12-31 23:59:59
-            '%Y-%m-%d %H:%M',     # 2024-12-31 23:59
-            '%Y-%m-%d',           # 2024-12-31 (defaults to 00:00:00)
-            '%d-%m-%Y %H:%M:%S',  # 31-12-2024 23:59:59
-            '%d-%m-%Y %H:%M',     # 31-12-2024 23:59
-            '%d-%m-%Y',           # 31-12-2024
-        ]
-        
-        for fmt in formats:
-            try:
-                dt = datetime.strptime(human_time, fmt)
-                return int(dt.timestamp())
-            except ValueError:
-                continue
-        
+    if not isinstance(human_time, str):
         raise ValueError(f"Invalid datetime format: {human_time}")
-    except Exception as e:
-        raise ValueError(f"Failed to parse datetime: {str(e)}")
\ No newline at end of file
+    
+    match = _YEAR_FIRST_RE.match(human_time)
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+    else:
+        match = _DAY_FIRST_RE.match(human_time)
+        if not match:
+            raise ValueError(f"Invalid datetime format: {human_time}")
+        day, month, year, hour, minute, second = match.groups()
+    
+    try:
+        dt = datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    except ValueError as e:
+        raise ValueError(f"Failed to parse datetime: {str(e)}")
+    
+    return int(dt.timestamp())
\ No newline at end of file
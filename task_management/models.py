@@ -1,7 +1,9 @@
 from beanie import Document
 from pydantic import Field, field_validator
 from typing import Optional
-import time
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from task_management.helper import now_epoch
+from .schemas import PriorityLiteral, StatusLiteral
 
 
 ##############################################################################################################################
@@ -11,30 +13,17 @@ class Tasks(Document):
     title: str = Field(..., description="Title of the task")
     description: str = Field(..., description="Description of the task")
     user_id: str = Field(..., description="ID of the user who created the task")
-    created_at: int = Field(default_factory=lambda: int(time.time()))
+    created_at: int = Field(default_factory=now_epoch)
     updated_at: Optional[int] = None
     start_task_time: int = Field(..., description="Start time of task in epoch")
     end_task_time: int = Field(..., description="End time of task in epoch")
+    # formatted once on write so reads echo them; None on tasks written before these fields existed
+    start_task_time_human: Optional[str] = None
+    end_task_time_human: Optional[str] = None
     is_completed: bool = False
     is_active: bool = True
-    priority: str = Field(default="medium", description="Priority: low, medium, high")
-    status: str = Field(default="pending", description="Status: pending, in_progress, completed, cancelled")
-
-    @field_validator('priority')
-    def validate_priority(cls, v):
-        """Validate task priority"""
-        allowed_priorities = ['low', 'medium', 'high']
-        if v.lower() not in allowed_priorities:
-            raise ValueError(f'Priority must be one of: {", ".join(allowed_priorities)}')
-        return v.lower()
-
-    @field_validator('status')
-    def validate_status(cls, v):
-        """Validate task status"""
-        allowed_statuses = ['pending', 'in_progress', 'completed', 'cancelled']
-        if v.lower() not in allowed_statuses:
-            raise ValueError(f'Status must be one of: {", ".join(allowed_statuses)}')
-        return v.lower()
+    priority: PriorityLiteral = Field(default="medium", description="Priority: low, medium, high")
+    status: StatusLiteral = Field(default="pending", description="Status: pending, in_progress, completed, cancelled")
 
     @field_validator('start_task_time', 'end_task_time')
     def validate_task_times(cls, v):
@@ -45,5 +34,15 @@ class Tasks(Document):
 
     class Settings:
         name = "tasks"
+        # ESR order (equality, then sort, then range) matching the queries in services.py;
+        # every index starts with user_id, so no standalone user_id index is needed
+        indexes = [
+            # list view: user's live tasks newest first, optionally by status or priority
+            IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("created_at", DESCENDING)], name="user_active_created"),
+            IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("status", ASCENDING), ("created_at", DESCENDING)], name="user_active_status_created"),
+            IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("priority", ASCENDING), ("created_at", DESCENDING)], name="user_active_priority_created"),
+            # overdue: equality on user_id/is_active/is_completed, then end_task_time range and sort
+            IndexModel([("user_id", ASCENDING), ("is_active", ASCENDING), ("is_completed", ASCENDING), ("end_task_time", DESCENDING)], name="user_active_completed_end"),
+        ]
         
 ########################################################################################################
\ No newline at end of file
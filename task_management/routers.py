@@ -1,21 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Body, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from typing import List, Optional
+from pydantic import ValidationError
 
 from .schemas import (
-    TaskCreate, TaskUpdate, TaskResponse, TaskFilter, TaskStats
+    TaskCreate, TaskUpdate, TaskResponse, TaskFilter, TaskStats, PriorityChoice, StatusChoice
 )
 from .services import (
-    create_task, get_user_tasks, get_task_by_id, update_task, 
+    create_task, bulk_create_tasks, get_user_tasks, stream_user_tasks, get_task_by_id, update_task, 
     delete_task, get_user_task_stats, mark_task_completed, get_overdue_tasks
 )
-from datetime import datetime, date
+from datetime import datetime, date, timedelta
 from auth.routers import get_current_api_key
 
 
 ################################################################################################################################
 ############### API routers for task management ###############################################################################
 
-task_router = APIRouter(prefix="/tasks", tags=["Task Management"])
+task_router = APIRouter(prefix="/tasks", tags=["Task Management"], default_response_class=ORJSONResponse)
 
 ################################################################################################################################
 ############ Create a new task for authenticated user ##########################################################################
@@ -29,34 +31,83 @@ async def create_user_task(
     """Create a new task for a user (requires API key authentication)"""
     return await create_task(user_id, task_data)
 
+################################################################################################################################
+############ Create several tasks at once for a user ##########################################################################
+
+@task_router.post("/bulk", response_model=List[TaskResponse])
+async def create_user_tasks_bulk(
+    tasks_data: List[TaskCreate] = Body(..., min_length=1, max_length=500),
+    user_id: str = Query(..., description="ID of the user creating the tasks"),
+    current_key = Depends(get_current_api_key)
+):
+    """Create several tasks for a user in one request (requires API key authentication)"""
+    return await bulk_create_tasks(user_id, tasks_data)
+
+################################################################################################################################
+########### Query-string filters shared by the task list endpoints ############################################################
+
+def build_task_filter(
+    status: Optional[StatusChoice] = Query(None, description="Filter by status: pending, in_progress, completed, cancelled"),
+    priority: Optional[PriorityChoice] = Query(None, description="Filter by priority: low, medium, high"),
+    is_completed: Optional[bool] = Query(None, description="Filter by completion status"),
+    start_date: Optional[str] = Query(None, description="Filter tasks starting from this date (YYYY-MM-DD)"),
+    end_date: Optional[str] = Query(None, description="Filter tasks ending before this date (YYYY-MM-DD)")
+) -> Optional[TaskFilter]:
+    """Build a TaskFilter from query params, or None when no filter was given"""
+    # is_completed=False is a real filter, so it is tested against None rather than for truthiness
+    if not (status or priority or is_completed is not None or start_date or end_date):
+        return None
+    
+    filters = dict(
+        status=status,
+        priority=priority,
+        is_completed=is_completed,
+        start_date=start_date,
+        end_date=end_date
+    )
+    # Dates still need TaskFilter's parsing to epoch ints; everything else is already typed by FastAPI
+    if start_date is not None or end_date is not None:
+        return _validated_task_filter(filters)
+    return TaskFilter.model_construct(**filters)
+
+
+def _validated_task_filter(filters: dict) -> TaskFilter:
+    """Validate a TaskFilter, reporting an unparseable date as 400"""
+    try:
+        return TaskFilter(**filters)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid {e.errors()[0]['loc'][0]} format"
+        )
+
 ################################################################################################################################
 ########### Get all tasks for a user with optional filtering ###################################################################
 
 @task_router.get("/", response_model=List[TaskResponse])
 async def get_tasks_for_user(
     user_id: str = Query(..., description="ID of the user"),
-    status: Optional[str] = Query(None, description="Filter by status: pending, in_progress, completed, cancelled"),
-    priority: Optional[str] = Query(None, description="Filter by priority: low, medium, high"),
-    is_completed: Optional[bool] = Query(None, description="Filter by completion status"),
-    start_date: Optional[str] = Query(None, description="Filter tasks starting from this date (YYYY-MM-DD)"),
-    end_date: Optional[str] = Query(None, description="Filter tasks ending before this date (YYYY-MM-DD)"),
+    task_filter: Optional[TaskFilter] = Depends(build_task_filter),
     current_key = Depends(get_current_api_key)
 ):
-    """Get all tasks for a user with optional filtering (requires API key authentication)"""
-    
-    # Create filter object if any filters are provided
-    task_filter = None
-    if any([status, priority, is_completed, start_date, end_date]):
-        task_filter = TaskFilter(
-            status=status,
-            priority=priority,
-            is_completed=is_completed,
-            start_date=start_date,
-            end_date=end_date
-        )
-    
+    """Get all tasks for a user, filtered e.g. by ?priority=high or ?status=pending (requires API key authentication)"""
     return await get_user_tasks(user_id, task_filter)
 
+################################################################################################################################
+########### Stream all tasks for a user (large result sets) ####################################################################
+
+@task_router.get("/stream", response_class=StreamingResponse)
+async def stream_tasks_for_user(
+    user_id: str = Query(..., description="ID of the user"),
+    task_filter: Optional[TaskFilter] = Depends(build_task_filter),
+    fields: Optional[str] = Query(None, description="Comma separated fields to return, e.g. title,status,end_task_time"),
+    current_key = Depends(get_current_api_key)
+):
+    """Stream all tasks for a user as a JSON array, same filters as GET /tasks (requires API key authentication)"""
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    chunks = await stream_user_tasks(user_id, task_filter, field_list)
+    return StreamingResponse(chunks, media_type="application/json")
+
 ################################################################################################################################
 ############ Get a specific task by ID ########################################################################################
 
@@ -135,33 +186,19 @@ async def get_user_overdue_tasks(
     return await get_overdue_tasks(user_id)
 
 ################################################################################################################################
-############ Get tasks by priority ##########################################################################################
-
-@task_router.get("/priority/{priority}", response_model=List[TaskResponse])
-async def get_tasks_by_priority(
-    priority: str,
-    user_id: str = Query(..., description="ID of the user"),
-    current_key = Depends(get_current_api_key)
-):
-    """Get tasks filtered by priority (requires API key authentication)"""
-    task_filter = TaskFilter(priority=priority)
-    return await get_user_tasks(user_id, task_filter)
-
-################################################################################################################################
-############ Get tasks by status ############################################################################################
+############ Get today's tasks for a user ###################################################################################
 
-@task_router.get("/status/{status}", response_model=List[TaskResponse])
-async def get_tasks_by_status(
-    status: str,
-    user_id: str = Query(..., description="ID of the user"),
-    current_key = Depends(get_current_api_key)
-):
-    """Get tasks filtered by status (requires API key authentication)"""
-    task_filter = TaskFilter(status=status)
-    return await get_user_tasks(user_id, task_filter)
+# Today's bounds only change at midnight, so they are computed once per day per process
+_TODAY_CACHE = {"day": None, "start": 0, "end": 0}
 
-################################################################################################################################
-############ Get today's tasks for a user ###################################################################################
+def _today_bounds():
+    """Local-midnight bounds of today as epoch ints, matched directly against start_task_time"""
+    today = date.today()
+    if _TODAY_CACHE["day"] != today:
+        _TODAY_CACHE["start"] = int(datetime.combine(today, datetime.min.time()).timestamp())
+        _TODAY_CACHE["end"] = int(datetime.combine(today + timedelta(days=1), datetime.min.time()).timestamp())
+        _TODAY_CACHE["day"] = today
+    return _TODAY_CACHE["start"], _TODAY_CACHE["end"]
 
 @task_router.get("/today/list", response_model=List[TaskResponse])
 async def get_today_tasks(
@@ -169,13 +206,12 @@ async def get_today_tasks(
     current_key = Depends(get_current_api_key)
 ):
     """Get tasks scheduled for today (requires API key authentication)"""
-        
-    today = date.today()
-    today_str = today.strftime('%Y-%m-%d')
     
-    task_filter = TaskFilter(
-        start_date=today_str,
-        end_date=today_str
+    start_epoch, end_epoch = _today_bounds()
+    
+    task_filter = TaskFilter.model_construct(
+        start_epoch=start_epoch,
+        end_epoch=end_epoch
     )
     return await get_user_tasks(user_id, task_filter)
 
@@ -1,7 +1,41 @@
-from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from beanie import PydanticObjectId
+from pydantic import AfterValidator, BaseModel, BeforeValidator, ConfigDict, Field
+from typing import Annotated, Literal, Optional, Union
 from task_management.helper import human_time_to_epoch
 
+##################################################################################################################
+################################## Allowed task priority and status values #######################################
+
+PriorityLiteral = Literal["low", "medium", "high"]
+StatusLiteral = Literal["pending", "in_progress", "completed", "cancelled"]
+
+##################################################################################################################
+################################## Shared validated field types ##################################################
+
+def _lowercase_choice(v):
+    """Accept priority/status case-insensitively"""
+    # the usual already-lowercase value skips the .lower() copy
+    if isinstance(v, str) and not v.islower():
+        return v.lower()
+    return v
+
+def _parse_task_time(v):
+    """Parse human readable time once; the service receives positive epoch seconds"""
+    if isinstance(v, str):
+        try:
+            v = human_time_to_epoch(v)
+        except ValueError as e:
+            raise ValueError(f"Invalid time format: {str(e)}")
+    # same rule as Tasks.validate_task_times, checked here so bad input is a 422 before any write
+    if v <= 0:
+        raise ValueError('Task time must be a valid positive timestamp')
+    return v
+
+# defined once and reused, so every schema shares the same validators
+PriorityChoice = Annotated[PriorityLiteral, BeforeValidator(_lowercase_choice)]
+StatusChoice = Annotated[StatusLiteral, BeforeValidator(_lowercase_choice)]
+TaskTime = Annotated[Union[int, str], AfterValidator(_parse_task_time)]
+
 ##################################################################################################################
 ################################## Schema for creating a new task ################################################
 
@@ -16,36 +50,27 @@ class TaskCreate(BaseModel):
         description="Detailed description of the task",
         examples=["Write comprehensive documentation for the user authentication system"]
     )
-    start_task_time: str = Field(
+    start_task_time: TaskTime = Field(
         ...,
         description="Start time in human readable format (YYYY-MM-DD HH:MM:SS or YYYY-MM-DD HH:MM or YYYY-MM-DD)",
         examples=["2024-12-31 09:00:00", "2024-12-31 09:00", "2024-12-31"]
     )
-    end_task_time: str = Field(
+    end_task_time: TaskTime = Field(
         ...,
         description="End time in human readable format (YYYY-MM-DD HH:MM:SS or YYYY-MM-DD HH:MM or YYYY-MM-DD)",
         examples=["2024-12-31 17:00:00", "2024-12-31 17:00", "2024-12-31"]
     )
-    priority: Optional[str] = Field(
+    priority: Optional[PriorityChoice] = Field(
         default="medium",
         description="Task priority: low, medium, high",
         examples=["high", "medium", "low"]
     )
-    status: Optional[str] = Field(
+    status: Optional[StatusChoice] = Field(
         default="pending",
         description="Task status: pending, in_progress, completed, cancelled",
         examples=["pending", "in_progress", "completed"]
     )
 
-    @field_validator('start_task_time', 'end_task_time')
-    def validate_time_format(cls, v):
-        """Validate and convert human readable time"""
-        try:
-            epoch_time = human_time_to_epoch(v)
-            return v  # Return original for now, will convert in service
-        except ValueError as e:
-            raise ValueError(f"Invalid time format: {str(e)}")
-
 ###################################################################################################################
 ######################### Schema for updating a task ##############################################################
 
@@ -60,22 +85,22 @@ class TaskUpdate(BaseModel):
         description="Detailed description of the task",
         examples=["Updated documentation for the user authentication system"]
     )
-    start_task_time: Optional[str] = Field(
+    start_task_time: Optional[TaskTime] = Field(
         None,
         description="Start time in human readable format",
         examples=["2024-12-31 10:00:00"]
     )
-    end_task_time: Optional[str] = Field(
+    end_task_time: Optional[TaskTime] = Field(
         None,
         description="End time in human readable format",
         examples=["2024-12-31 18:00:00"]
     )
-    priority: Optional[str] = Field(
+    priority: Optional[PriorityChoice] = Field(
         None,
         description="Task priority: low, medium, high",
         examples=["high"]
     )
-    status: Optional[str] = Field(
+    status: Optional[StatusChoice] = Field(
         None,
         description="Task status: pending, in_progress, completed, cancelled",
         examples=["in_progress"]
@@ -86,21 +111,14 @@ class TaskUpdate(BaseModel):
         examples=[True, False]
     )
 
-    @field_validator('start_task_time', 'end_task_time')
-    def validate_time_format(cls, v):
-        """Validate time format if provided"""
-        if v is not None:
-            try:
-                human_time_to_epoch(v)
-                return v
-            except ValueError as e:
-                raise ValueError(f"Invalid time format: {str(e)}")
-        return v
-
 ################################################################################################################################
 ####################################### Schema for task response ###############################################################
 
 class TaskResponse(BaseModel):
+    # built with model_construct from already-validated task documents; frozen because
+    # instances are shared through the task list cache
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     id: str
     title: str
     description: str
@@ -113,8 +131,27 @@ class TaskResponse(BaseModel):
     end_task_time_human: str    # Human readable format
     is_completed: bool
     is_active: bool
-    priority: str
-    status: str
+    priority: PriorityLiteral
+    status: StatusLiteral
+
+##########################################################################################################################
+####################################### Projection used by the list queries ##############################################
+
+class TaskProjection(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    description: str
+    user_id: str
+    created_at: int
+    updated_at: Optional[int] = None
+    start_task_time: int
+    end_task_time: int
+    start_task_time_human: Optional[str] = None
+    end_task_time_human: Optional[str] = None
+    is_completed: bool
+    is_active: bool
+    priority: PriorityLiteral
+    status: StatusLiteral
 
 ##########################################################################################################################
 ####################################### Schema for task filtering and searching ##########################################
@@ -123,13 +160,18 @@ class TaskFilter(BaseModel):
     status: Optional[str] = Field(None, description="Filter by status")
     priority: Optional[str] = Field(None, description="Filter by priority")
     is_completed: Optional[bool] = Field(None, description="Filter by completion status")
-    start_date: Optional[str] = Field(None, description="Filter tasks starting from this date")
-    end_date: Optional[str] = Field(None, description="Filter tasks ending before this date")
+    # dates arrive as strings and are parsed to epoch seconds on validation
+    start_date: Optional[TaskTime] = Field(None, description="Filter tasks starting from this date")
+    end_date: Optional[TaskTime] = Field(None, description="Filter tasks ending before this date")
+    start_epoch: Optional[int] = Field(None, description="Only tasks starting at or after this epoch")
+    end_epoch: Optional[int] = Field(None, description="Only tasks starting before this epoch")
 
 ########################################################################################################################
 ####################################### Schema for task statistics ######################################################
 
 class TaskStats(BaseModel):
+    model_config = ConfigDict(extra="ignore", frozen=True)
+
     total_tasks: int
     completed_tasks: int
     pending_tasks: int
@@ -1,10 +1,67 @@
-import time
-from typing import Optional, List
+import asyncio
+import os
+from typing import AsyncIterator, Optional, List, Tuple, Union
+import orjson
+from beanie import UpdateResponse
+from bson import ObjectId
+from cachetools import TTLCache
+from bson.errors import InvalidId
+from pymongo.errors import BulkWriteError
 from fastapi import HTTPException, status
-from task_management.helper import epoch_to_human_time, validate_user_exists
+from task_management.helper import epoch_to_human_time, now_epoch, validate_user_exists
 from .models import Tasks
-from .schemas import TaskCreate, TaskUpdate, TaskResponse, TaskFilter, TaskStats, human_time_to_epoch
+from .schemas import (
+    TaskCreate, TaskUpdate, TaskResponse, TaskFilter, TaskStats, TaskProjection
+)
 
+#################################################################################################################
+############################## Short-lived cache of task lists per user #########################################
+
+# Off unless TASK_LIST_CACHE_TTL > 0. The cache is per process: with several workers a write only
+# invalidates its own worker, so other workers can serve a list up to TTL seconds stale
+TASK_LIST_CACHE_TTL = int(os.getenv("TASK_LIST_CACHE_TTL", "0"))
+
+# user_id -> {filter key: responses}; any write for a user drops that user's whole entry
+_task_list_cache: Optional[TTLCache] = (
+    TTLCache(maxsize=10000, ttl=TASK_LIST_CACHE_TTL) if TASK_LIST_CACHE_TTL > 0 else None
+)
+
+def _task_filter_key(task_filter: Optional[TaskFilter]) -> Optional[Tuple]:
+    """Hashable key for a task filter"""
+    if task_filter is None:
+        return None
+    return (
+        task_filter.status, task_filter.priority, task_filter.is_completed,
+        task_filter.start_date, task_filter.end_date,
+        task_filter.start_epoch, task_filter.end_epoch
+    )
+
+def _invalidate_task_list_cache(user_id: str) -> None:
+    """Forget every cached task list for the user"""
+    if _task_list_cache is not None:
+        _task_list_cache.pop(user_id, None)
+
+#################################################################################################################
+############################## Map a stored task to its API response ############################################
+
+def _to_response(task: Union[Tasks, TaskProjection]) -> TaskResponse:
+    """Build a TaskResponse from an already-validated task document, skipping re-validation"""
+    return TaskResponse.model_construct(
+        id=str(task.id),
+        title=task.title,
+        description=task.description,
+        user_id=task.user_id,
+        created_at=task.created_at,
+        updated_at=task.updated_at,
+        start_task_time=task.start_task_time,
+        end_task_time=task.end_task_time,
+        start_task_time_human=task.start_task_time_human or epoch_to_human_time(task.start_task_time),
+        end_task_time_human=task.end_task_time_human or epoch_to_human_time(task.end_task_time),
+        is_completed=task.is_completed,
+        is_active=task.is_active,
+        priority=task.priority,
+        status=task.status
+    )
 
 #################################################################################################################
 ############################## Create a new task for a user #####################################################
@@ -19,15 +76,9 @@ async def create_task(user_id: str, task_data: TaskCreate) -> TaskResponse:
             detail="User not found or inactive"
         )
     
-    # Convert human readable times to epoch
-    try:
-        start_epoch = human_time_to_epoch(task_data.start_task_time)
-        end_epoch = human_time_to_epoch(task_data.end_task_time)
-    except ValueError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid time format: {str(e)}"
-        )
+    # Times were already parsed to epoch seconds by TaskCreate
+    start_epoch = task_data.start_task_time
+    end_epoch = task_data.end_task_time
     
     # Validate that end time is after start time
     if end_epoch <= start_epoch:
@@ -43,100 +94,202 @@ async def create_task(user_id: str, task_data: TaskCreate) -> TaskResponse:
         user_id=user_id,
         start_task_time=start_epoch,
         end_task_time=end_epoch,
+        start_task_time_human=epoch_to_human_time(start_epoch),
+        end_task_time_human=epoch_to_human_time(end_epoch),
         priority=task_data.priority or "medium",
         status=task_data.status or "pending",
-        created_at=int(time.time())
+        created_at=now_epoch()
     )
     
     await task.insert()
+    _invalidate_task_list_cache(user_id)
     
-    return TaskResponse(
-        id=str(task.id),
-        title=task.title,
-        description=task.description,
-        user_id=task.user_id,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        start_task_time=task.start_task_time,
-        end_task_time=task.end_task_time,
-        start_task_time_human=epoch_to_human_time(task.start_task_time),
-        end_task_time_human=epoch_to_human_time(task.end_task_time),
-        is_completed=task.is_completed,
-        is_active=task.is_active,
-        priority=task.priority,
-        status=task.status
-    )
+    return _to_response(task)
 
 #####################################################################################################################
-################### Get all tasks for a user with optional filtering ################################################
+############################## Create several tasks for a user in one insert ########################################
 
-async def get_user_tasks(user_id: str, task_filter: Optional[TaskFilter] = None) -> List[TaskResponse]:
-    """Get all tasks for a specific user with optional filtering"""
+async def bulk_create_tasks(user_id: str, tasks_data: List[TaskCreate]) -> List[TaskResponse]:
+    """Create several tasks for the user with a single insert_many round-trip"""
     
-    # Validate user exists
+    # Validate user exists and is active
     if not await validate_user_exists(user_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found or inactive"
         )
     
+    # Validate every task before writing any of them
+    for index, task_data in enumerate(tasks_data):
+        if task_data.end_task_time <= task_data.start_task_time:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Task {index}: End time must be after start time"
+            )
+    
+    created_at = now_epoch()
+    tasks = [
+        Tasks(
+            title=task_data.title,
+            description=task_data.description,
+            user_id=user_id,
+            start_task_time=task_data.start_task_time,
+            end_task_time=task_data.end_task_time,
+            start_task_time_human=epoch_to_human_time(task_data.start_task_time),
+            end_task_time_human=epoch_to_human_time(task_data.end_task_time),
+            priority=task_data.priority or "medium",
+            status=task_data.status or "pending",
+            created_at=created_at
+        ) for task_data in tasks_data
+    ]
+    
+    # Ordered insert: a failure stops the batch, so exactly the tasks before it were written
+    try:
+        result = await Tasks.insert_many(tasks)
+    except BulkWriteError as e:
+        _invalidate_task_list_cache(user_id)
+        inserted = e.details.get("nInserted", 0)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Task {inserted}: insert failed; tasks 0-{inserted - 1} were created" if inserted
+            else "Task 0: insert failed; no tasks were created"
+        )
+    for task, inserted_id in zip(tasks, result.inserted_ids):
+        task.id = inserted_id
+    _invalidate_task_list_cache(user_id)
+    
+    return [_to_response(task) for task in tasks]
+
+#####################################################################################################################
+################### Mongo query for a user's task list and its filters ##############################################
+
+def _build_task_query(user_id: str, task_filter: Optional[TaskFilter]) -> dict:
+    """Translate a TaskFilter into the Mongo query for the user's live tasks"""
+    
     # Build query
     query = {"user_id": user_id, "is_active": True}
     
     # Apply filters if provided
     if task_filter:
         if task_filter.status:
-            query["status"] = task_filter.status.lower()
+            query["status"] = task_filter.status
         if task_filter.priority:
-            query["priority"] = task_filter.priority.lower()
+            query["priority"] = task_filter.priority
         if task_filter.is_completed is not None:
             query["is_completed"] = task_filter.is_completed
         
-        # Date range filtering
-        if task_filter.start_date:
-            try:
-                start_epoch = human_time_to_epoch(task_filter.start_date)
-                query["start_task_time"] = {"$gte": start_epoch}
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid start_date format"
-                )
+        # Date range filtering (already epoch seconds, parsed by TaskFilter)
+        if task_filter.start_date is not None:
+            query["start_task_time"] = {"$gte": task_filter.start_date}
         
-        if task_filter.end_date:
-            try:
-                end_epoch = human_time_to_epoch(task_filter.end_date)
-                if "end_task_time" not in query:
-                    query["end_task_time"] = {}
-                query["end_task_time"]["$lte"] = end_epoch
-            except ValueError:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Invalid end_date format"
-                )
-    
-    # Get tasks
-    tasks = await Tasks.find(query).sort("-created_at").to_list()
-    
-    return [
-        TaskResponse(
-            id=str(task.id),
-            title=task.title,
-            description=task.description,
-            user_id=task.user_id,
-            created_at=task.created_at,
-            updated_at=task.updated_at,
-            start_task_time=task.start_task_time,
-            end_task_time=task.end_task_time,
-            start_task_time_human=epoch_to_human_time(task.start_task_time),
-            end_task_time_human=epoch_to_human_time(task.end_task_time),
-            is_completed=task.is_completed,
-            is_active=task.is_active,
-            priority=task.priority,
-            status=task.status
-        ) for task in tasks
-    ]
+        if task_filter.end_date is not None:
+            query["end_task_time"] = {"$lte": task_filter.end_date}
+        
+        # Pre-computed epoch window on start_task_time (e.g. today's tasks)
+        if task_filter.start_epoch is not None or task_filter.end_epoch is not None:
+            start_range = query.setdefault("start_task_time", {})
+            if task_filter.start_epoch is not None:
+                start_range["$gte"] = max(task_filter.start_epoch, start_range.get("$gte", task_filter.start_epoch))
+            if task_filter.end_epoch is not None:
+                start_range["$lt"] = task_filter.end_epoch
+    
+    return query
+
+#####################################################################################################################
+################### Get all tasks for a user with optional filtering ################################################
+
+async def get_user_tasks(user_id: str, task_filter: Optional[TaskFilter] = None) -> List[TaskResponse]:
+    """Get all tasks for a specific user with optional filtering"""
+    
+    # Serve repeated dashboard reads from the short-lived cache, when it is enabled
+    filter_key = _task_filter_key(task_filter)
+    if _task_list_cache is not None:
+        cached = _task_list_cache.get(user_id)
+        if cached is not None and filter_key in cached:
+            return list(cached[filter_key])
+    
+    query = _build_task_query(user_id, task_filter)
+    
+    # The user check and the task fetch are independent, so they share one round-trip
+    user_ok, tasks = await asyncio.gather(
+        validate_user_exists(user_id),
+        Tasks.find(query).sort("-created_at").project(TaskProjection).to_list()
+    )
+    if not user_ok:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found or inactive"
+        )
+    
+    responses = [_to_response(task) for task in tasks]
+    if _task_list_cache is not None:
+        _task_list_cache.setdefault(user_id, {})[filter_key] = responses
+    
+    return list(responses)
+
+
+#####################################################################################################################
+################### Stream all tasks for a user as a JSON array #####################################################
 
+# Fields /tasks/stream can be narrowed to; id is always returned
+SELECTABLE_TASK_FIELDS = frozenset(TaskResponse.model_fields) - {"id"}
+_HUMAN_TIME_SOURCES = {
+    "start_task_time_human": "start_task_time",
+    "end_task_time_human": "end_task_time",
+}
+
+async def stream_user_tasks(
+    user_id: str, task_filter: Optional[TaskFilter] = None, fields: Optional[List[str]] = None
+) -> AsyncIterator[bytes]:
+    """Validate the request, then return a generator of JSON array chunks read straight off the cursor"""
+    
+    # Validate before the response starts so errors still become proper HTTP errors
+    if fields:
+        unknown = set(fields) - SELECTABLE_TASK_FIELDS
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+            )
+    
+    if not await validate_user_exists(user_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found or inactive"
+        )
+    
+    query = _build_task_query(user_id, task_filter)
+    
+    async def chunks() -> AsyncIterator[bytes]:
+        yield b"["
+        separator = b""
+        async for task in Tasks.find(query).sort("-created_at").project(TaskProjection):
+            yield separator + orjson.dumps(_to_response(task).model_dump())
+            separator = b","
+        yield b"]"
+    
+    async def partial_chunks() -> AsyncIterator[bytes]:
+        # Only the requested fields leave the server; human times also need their epoch source
+        projection = {field: 1 for field in fields}
+        for human_field, epoch_field in _HUMAN_TIME_SOURCES.items():
+            if human_field in projection:
+                projection[epoch_field] = 1
+        
+        yield b"["
+        separator = b""
+        cursor = Tasks.get_motor_collection().find(query, projection).sort("created_at", -1)
+        async for doc in cursor:
+            row = {"id": str(doc["_id"])}
+            for field in fields:
+                if field in _HUMAN_TIME_SOURCES:
+                    row[field] = doc.get(field) or epoch_to_human_time(doc[_HUMAN_TIME_SOURCES[field]])
+                else:
+                    row[field] = doc.get(field)
+            yield separator + orjson.dumps(row)
+            separator = b","
+        yield b"]"
+    
+    return partial_chunks() if fields else chunks()
 
 ##############################################################################################################
 ############################# Get a specific task by ID ######################################################
@@ -144,42 +297,23 @@ async def get_user_tasks(user_id: str, task_filter: Optional[TaskFilter] = None)
 async def get_task_by_id(user_id: str, task_id: str) -> TaskResponse:
     """Get a specific task by ID for a user"""
     
-    # Validate user exists
-    if not await validate_user_exists(user_id):
+    try:
+        task_oid = ObjectId(task_id)
+    except InvalidId:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found or inactive"
+            detail="Task not found"
         )
     
-    try:
-        task = await Tasks.get(task_id)
-        if not task or not task.is_active or task.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
-    except:
+    # Owner and liveness are part of the filter, so a wrong or missing user is a 404 here too
+    task = await Tasks.find_one({"_id": task_oid, "user_id": user_id, "is_active": True})
+    if not task:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
-    return TaskResponse(
-        id=str(task.id),
-        title=task.title,
-        description=task.description,
-        user_id=task.user_id,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        start_task_time=task.start_task_time,
-        end_task_time=task.end_task_time,
-        start_task_time_human=epoch_to_human_time(task.start_task_time),
-        end_task_time_human=epoch_to_human_time(task.end_task_time),
-        is_completed=task.is_completed,
-        is_active=task.is_active,
-        priority=task.priority,
-        status=task.status
-    )
+    return _to_response(task)
 
 #########################################################################################################################
 ######################################## Update a task ##################################################################
@@ -187,26 +321,17 @@ async def get_task_by_id(user_id: str, task_id: str) -> TaskResponse:
 async def update_task(user_id: str, task_id: str, task_data: TaskUpdate) -> TaskResponse:
     """Update a specific task for a user"""
     
-    # Validate user exists
-    if not await validate_user_exists(user_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found or inactive"
-        )
-    
     try:
-        task = await Tasks.get(task_id)
-        if not task or not task.is_active or task.user_id != user_id:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Task not found"
-            )
-    except:
+        task_oid = ObjectId(task_id)
+    except InvalidId:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Task not found"
         )
     
+    # Owner and liveness are part of the filter, so a wrong or missing user is a 404 here too
+    task_match = {"_id": task_oid, "user_id": user_id, "is_active": True}
+    
     # Prepare update data
     update_data = {}
     
@@ -215,11 +340,11 @@ async def update_task(user_id: str, task_id: str, task_data: TaskUpdate) -> Task
     if task_data.description is not None:
         update_data["description"] = task_data.description
     if task_data.priority is not None:
-        update_data["priority"] = task_data.priority.lower()
+        update_data["priority"] = task_data.priority
     if task_data.status is not None:
-        update_data["status"] = task_data.status.lower()
+        update_data["status"] = task_data.status
         # Auto-complete task if status is completed
-        if task_data.status.lower() == "completed":
+        if task_data.status == "completed":
             update_data["is_completed"] = True
     if task_data.is_completed is not None:
         update_data["is_completed"] = task_data.is_completed
@@ -227,59 +352,56 @@ async def update_task(user_id: str, task_id: str, task_data: TaskUpdate) -> Task
         if task_data.is_completed:
             update_data["status"] = "completed"
     
-    # Handle time updates
-    start_epoch = task.start_task_time
-    end_epoch = task.end_task_time
+    # Times were already parsed to epoch seconds by TaskUpdate
+    start_epoch = task_data.start_task_time
+    end_epoch = task_data.end_task_time
+    
+    if start_epoch is not None:
+        update_data["start_task_time"] = start_epoch
+        update_data["start_task_time_human"] = epoch_to_human_time(start_epoch)
     
-    if task_data.start_task_time is not None:
-        try:
-            start_epoch = human_time_to_epoch(task_data.start_task_time)
-            update_data["start_task_time"] = start_epoch
-        except ValueError as e:
+    if end_epoch is not None:
+        update_data["end_task_time"] = end_epoch
+        update_data["end_task_time_human"] = epoch_to_human_time(end_epoch)
+    
+    # Validate time logic; when only one side changes, the stored side is checked by the filter
+    update_match = dict(task_match)
+    if start_epoch is not None and end_epoch is not None:
+        if end_epoch <= start_epoch:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid start time format: {str(e)}"
+                detail="End time must be after start time"
             )
-    
-    if task_data.end_task_time is not None:
-        try:
-            end_epoch = human_time_to_epoch(task_data.end_task_time)
-            update_data["end_task_time"] = end_epoch
-        except ValueError as e:
+    elif start_epoch is not None:
+        update_match["end_task_time"] = {"$gt": start_epoch}
+    elif end_epoch is not None:
+        update_match["start_task_time"] = {"$lt": end_epoch}
+    
+    if not update_data:
+        task = await Tasks.find_one(task_match)
+    else:
+        update_data["updated_at"] = now_epoch()
+        # Match, update and read back the new document in one round-trip
+        task = await Tasks.find_one(update_match).update(
+            {"$set": update_data},
+            response_type=UpdateResponse.NEW_DOCUMENT
+        )
+        # No match: tell a bad time range apart from a missing task (failure path only)
+        if task is None and update_match != task_match and await Tasks.find(task_match).count():
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Invalid end time format: {str(e)}"
+                detail="End time must be after start time"
             )
+        if task is not None:
+            _invalidate_task_list_cache(user_id)
     
-    # Validate time logic
-    if end_epoch <= start_epoch:
+    if not task:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="End time must be after start time"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Task not found"
         )
     
-    # Update task
-    if update_data:
-        update_data["updated_at"] = int(time.time())
-        await task.update({"$set": update_data})
-        task = await Tasks.get(task_id)
-    
-    return TaskResponse(
-        id=str(task.id),
-        title=task.title,
-        description=task.description,
-        user_id=task.user_id,
-        created_at=task.created_at,
-        updated_at=task.updated_at,
-        start_task_time=task.start_task_time,
-        end_task_time=task.end_task_time,
-        start_task_time_human=epoch_to_human_time(task.start_task_time),
-        end_task_time_human=epoch_to_human_time(task.end_task_time),
-        is_completed=task.is_completed,
-        is_active=task.is_active,
-        priority=task.priority,
-        status=task.status
-    )
+    return _to_response(task)
 
 ###############################################################################################################################
 #################################### Delete a task (soft delete) ###############################################################
@@ -287,26 +409,24 @@ async def update_task(user_id: str, task_id: str, task_data: TaskUpdate) -> Task
 async def delete_task(user_id: str, task_id: str) -> bool:
     """Soft delete a task for a user"""
     
-    # Validate user exists
-    if not await validate_user_exists(user_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found or inactive"
-        )
-    
     try:
-        task = await Tasks.get(task_id)
-        if not task or not task.is_active or task.user_id != user_id:
-            return False
-    except:
+        task_oid = ObjectId(task_id)
+    except InvalidId:
         return False
     
-    await task.update({"$set": {
+    # Match on owner and soft delete in a single round-trip
+    result = await Tasks.find_one(
+        {"_id": task_oid, "user_id": user_id, "is_active": True}
+    ).update({"$set": {
         "is_active": False,
-        "updated_at": int(time.time())
+        "updated_at": now_epoch()
     }})
     
-    return True
+    deleted = result is not None and result.modified_count > 0
+    if deleted:
+        _invalidate_task_list_cache(user_id)
+    
+    return deleted
 
 ###############################################################################################################################
 ################################## Get task statistics for a user #############################################################
@@ -314,21 +434,34 @@ async def delete_task(user_id: str, task_id: str) -> bool:
 async def get_user_task_stats(user_id: str) -> TaskStats:
     """Get task statistics for a user"""
     
-    # Validate user exists
-    if not await validate_user_exists(user_id):
+    # Count every bucket server-side in one $match + $group pass, alongside the user check
+    user_ok, results = await asyncio.gather(
+        validate_user_exists(user_id),
+        Tasks.aggregate([
+            {"$match": {"user_id": user_id, "is_active": True}},
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "completed": {"$sum": {"$cond": ["$is_completed", 1, 0]}},
+                "pending": {"$sum": {"$cond": [{"$eq": ["$status", "pending"]}, 1, 0]}},
+                "in_progress": {"$sum": {"$cond": [{"$eq": ["$status", "in_progress"]}, 1, 0]}},
+                "cancelled": {"$sum": {"$cond": [{"$eq": ["$status", "cancelled"]}, 1, 0]}},
+            }},
+        ]).to_list()
+    )
+    if not user_ok:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found or inactive"
         )
     
-    # Get all active tasks for user
-    tasks = await Tasks.find({"user_id": user_id, "is_active": True}).to_list()
-    
-    total_tasks = len(tasks)
-    completed_tasks = len([t for t in tasks if t.is_completed])
-    pending_tasks = len([t for t in tasks if t.status == "pending"])
-    in_progress_tasks = len([t for t in tasks if t.status == "in_progress"])
-    cancelled_tasks = len([t for t in tasks if t.status == "cancelled"])
+    # $group emits no document when the user has no tasks
+    counts = results[0] if results else {}
+    total_tasks = counts.get("total", 0)
+    completed_tasks = counts.get("completed", 0)
+    pending_tasks = counts.get("pending", 0)
+    in_progress_tasks = counts.get("in_progress", 0)
+    cancelled_tasks = counts.get("cancelled", 0)
     
     completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0.0
     
@@ -360,40 +493,23 @@ async def mark_task_completed(user_id: str, task_id: str) -> TaskResponse:
 async def get_overdue_tasks(user_id: str) -> List[TaskResponse]:
     """Get overdue tasks for a user"""
     
-    # Validate user exists
-    if not await validate_user_exists(user_id):
+    # Find tasks that are not completed and past their end time, alongside the user check
+    # served by the user_active_completed_end index
+    user_ok, tasks = await asyncio.gather(
+        validate_user_exists(user_id),
+        Tasks.find({
+            "user_id": user_id,
+            "is_completed": False,
+            "end_task_time": {"$lt": now_epoch()},
+            "is_active": True
+        }).sort("-end_task_time").project(TaskProjection).to_list()
+    )
+    if not user_ok:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found or inactive"
         )
     
-    current_time = int(time.time())
-    
-    # Find tasks that are not completed and past their end time
-    tasks = await Tasks.find({
-        "user_id": user_id,
-        "is_active": True,
-        "is_completed": False,
-        "end_task_time": {"$lt": current_time}
-    }).sort("-end_task_time").to_list()
-    
-    return [
-        TaskResponse(
-            id=str(task.id),
-            title=task.title,
-            description=task.description,
-            user_id=task.user_id,
-            created_at=task.created_at,
-            updated_at=task.updated_at,
-            start_task_time=task.start_task_time,
-            end_task_time=task.end_task_time,
-            start_task_time_human=epoch_to_human_time(task.start_task_time),
-            end_task_time_human=epoch_to_human_time(task.end_task_time),
-            is_completed=task.is_completed,
-            is_active=task.is_active,
-            priority=task.priority,
-            status=task.status
-        ) for task in tasks
-    ]
+    return [_to_response(task) for task in tasks]
     
 ####################################################################################################################
\ No newline at end of file
@@ -1,11 +1,27 @@
-import random
-import string
+import hashlib
+import hmac
+import os
+import secrets
+from cachetools import TTLCache
+from config.settings import settings
 
 ####################################################################################################################
 ################## This will generate a 6 digit random OTp and this will send to the peoples #######################
 
 def generate_otp(length: int = 6) -> str:
     """Generate random OTP"""
-    return ''.join(random.choices(string.digits, k=length))
+    # one CSPRNG draw, zero padded to the requested length
+    return f"{secrets.randbelow(10 ** length):0{length}d}"
 
-##################################################################################################################
\ No newline at end of file
+
+def hash_otp(otp_code: str) -> str:
+    """Keyed hash of an OTP, so stored codes are useless without the server secret"""
+    return hmac.new(settings.secret_key.encode(), otp_code.encode(), hashlib.sha256).hexdigest()
+
+##################################################################################################################
+################## ids of users recently confirmed active, shared with the task service ############################
+
+# filled by validate_user_exists in task_management; update_user / delete_user evict the user
+active_user_cache: TTLCache = TTLCache(maxsize=50000, ttl=int(os.getenv("ACTIVE_USER_CACHE_TTL", "30")))
+
+##################################################################################################################
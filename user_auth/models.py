@@ -1,11 +1,27 @@
 from beanie import Document
 from pydantic import Field, EmailStr, field_validator
 from typing import Optional
+import asyncio
 import time
-from passlib.context import CryptContext
+from datetime import datetime
+import bcrypt
+from pymongo import ASCENDING, IndexModel
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+BCRYPT_ROUNDS = 12
+
+
+# bcrypt only reads the first 72 bytes; truncating keeps hashes made by passlib verifying
+def _hash_password(password: str) -> str:
+    return bcrypt.hashpw(password.encode()[:72], bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+
+def _verify_password(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode()[:72], hashed.encode())
+    except ValueError:
+        # stored value is not a bcrypt hash
+        return False
 
 
 # #####################################################################################################
@@ -28,31 +44,50 @@ class Users(Document):
         if not isinstance(v, int):
             raise ValueError('Mobile number must be an integer')
         
-        mobile_str = str(v)
-        
-        if not mobile_str.isdigit() or len(mobile_str) != 10:
-            raise ValueError('Mobile number must be exactly 10 digits')
-        
-        if mobile_str.startswith('0'):
-            raise ValueError('Mobile number cannot start with 0')
+        # 10 digits with no leading 0 is exactly this integer range
+        if not 1_000_000_000 <= v <= 9_999_999_999:
+            raise ValueError('Mobile number must be exactly 10 digits and cannot start with 0')
         
         return v
 
     class Settings:
         name = "users"
+        indexes = [
+            # lets the active-user existence check be answered from the index alone
+            IndexModel([("_id", ASCENDING), ("is_active", ASCENDING)], name="id_is_active"),
+            # Field(unique=True) alone does not create an index; these back the duplicate checks
+            IndexModel([("email_address", ASCENDING)], name="email_address_unique", unique=True),
+            IndexModel([("mobile_number", ASCENDING)], name="mobile_number_unique", unique=True),
+            # get_all_users pages active users in _id order; only active users are indexed
+            IndexModel(
+                [("is_active", ASCENDING), ("_id", ASCENDING)],
+                name="active_id_partial",
+                partialFilterExpression={"is_active": True},
+            ),
+        ]
 
     def hash_password(self, password: str):
         """Hash the password before storing"""
-        self.password = pwd_context.hash(password)
+        self.password = _hash_password(password)
 
     def verify_password(self, password: str) -> bool:
         """Verify password against hash"""
-        return pwd_context.verify(password, self.password)
+        return _verify_password(password, self.password)
+
+    @staticmethod
+    async def verify_hash_async(password: str, hashed: str) -> bool:
+        """Verify password against a given hash in a worker thread so bcrypt does not block the event loop"""
+        return await asyncio.to_thread(_verify_password, password, hashed)
 
     @classmethod
     def hash_password_static(cls, password: str) -> str:
         """Static method to hash password"""
-        return pwd_context.hash(password)
+        return _hash_password(password)
+
+    @classmethod
+    async def hash_password_async(cls, password: str) -> str:
+        """Hash password in a worker thread so bcrypt does not block the event loop"""
+        return await asyncio.to_thread(_hash_password, password)
 
 
 
@@ -61,15 +96,43 @@ class Users(Document):
 
 class OTPStore(Document):
     mobile_number: int
-    otp_code: str
+    # HMAC of the code (see helper.hash_otp); the plaintext OTP is never stored
+    otp_hash: Optional[str] = None
     created_at: int = Field(default_factory=lambda: int(time.time()))
     expires_at: int
+    # BSON Date copy of expires_at; TTL indexes only act on Date fields
+    purge_at: Optional[datetime] = None
     is_used: bool = False
     attempts: int = 0
 
     class Settings:
         name = "otp_store"
+        indexes = [
+            # MongoDB deletes each OTP once purge_at has passed
+            IndexModel([("purge_at", ASCENDING)], name="purge_at_ttl", expireAfterSeconds=0),
+            # verify_phone_otp: unused, unexpired OTP for a number
+            IndexModel([("mobile_number", ASCENDING), ("is_used", ASCENDING), ("expires_at", ASCENDING)], name="mobile_used_expires"),
+        ]
         
+########################################################################################################################
+### one row per number holding its last OTP send time, for the send_otp rate limit
+
+class OTPRateLimit(Document):
+    mobile_number: int
+    created_at: int = Field(default_factory=lambda: int(time.time()))
+    # BSON Date copy of when the window closes; only used to reap old rows
+    purge_at: Optional[datetime] = None
+
+    class Settings:
+        name = "otp_rate_limits"
+        indexes = [
+            # a second row for a number is rejected, which is what turns a racing send into a 429
+            IndexModel([("mobile_number", ASCENDING)], name="mobile_number_unique", unique=True),
+            # the TTL monitor runs about once a minute, so rows linger past their window; send_otp
+            # compares created_at itself and only relies on this for cleanup
+            IndexModel([("purge_at", ASCENDING)], name="purge_at_ttl", expireAfterSeconds=0),
+        ]
+
 ########################################################################################################################
 ### model to track verified phone numbers
 
@@ -78,9 +141,18 @@ class PhoneVerification(Document):
     verification_token: str = Field(..., unique=True, index=True)
     verified_at: int = Field(default_factory=lambda: int(time.time()))
     expires_at: int  # Verification expires after some time
+    # BSON Date copy of expires_at; TTL indexes only act on Date fields
+    purge_at: Optional[datetime] = None
     is_used: bool = False  # Track if this verification was used for registration
 
     class Settings:
         name = "phone_verifications"
+        indexes = [
+            # one verification per number: verify_phone_otp upserts on it and
+            # register_verified_user looks the number up through it
+            IndexModel([("mobile_number", ASCENDING)], name="mobile_number_unique", unique=True),
+            # MongoDB deletes each verification once purge_at has passed
+            IndexModel([("purge_at", ASCENDING)], name="purge_at_ttl", expireAfterSeconds=0),
+        ]
         
 ##########################################################################################################################
\ No newline at end of file
@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from typing import List, Optional
 from .schemas import (
     UserCreate, UserUpdate, UserResponse, UserLogin, UserLoginResponse,
     OTPRequest, OTPVerify, OTPResponse, PhoneVerificationResponse
@@ -63,9 +63,13 @@ async def login_user_endpoint(
 ############## API endpoint that shows all users ######################################################################################
 
 @user_auth_router.get("/", response_model=List[UserResponse])
-async def get_users(current_key = Depends(get_current_api_key)):
-    """Get all users (requires API key authentication)"""
-    return await get_all_users()
+async def get_users(
+    limit: int = Query(100, ge=1, le=500, description="Maximum number of users to return"),
+    after_id: Optional[str] = Query(None, description="Return users after this id (the last id of the previous page)"),
+    current_key = Depends(get_current_api_key)
+):
+    """Get active users one page at a time, oldest first (requires API key authentication)"""
+    return await get_all_users(limit=limit, after_id=after_id)
 
 #########################################################################################################################################
 ################# API endpoint to get a particular user ################################################################################
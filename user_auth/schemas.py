@@ -1,5 +1,18 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional, Union
+from beanie import PydanticObjectId
+from pydantic import AfterValidator, BaseModel, EmailStr, Field
+from typing import Annotated, ClassVar, Literal, Optional, Union
+
+# #################################################################################################
+# ######## mobile number type shared by every schema ##############################################
+
+def _validate_mobile(v: int) -> int:
+    """Validate that mobile number is exactly 10 digits"""
+    # pydantic has already coerced v to int; 10 digits with no leading 0 is exactly this range
+    if not 1_000_000_000 <= v <= 9_999_999_999:
+        raise ValueError('Mobile number must be exactly 10 digits and cannot start with 0')
+    return v
+
+MobileNumber = Annotated[int, AfterValidator(_validate_mobile)]
 
 # #################################################################################################
 # ######## request and response model of schemas.py file ##########################################
@@ -20,7 +33,7 @@ class UserCreate(BaseModel):
         description="The user's password.",
         examples=["securepassword123"]
     )
-    mobile_number: int = Field(
+    mobile_number: MobileNumber = Field(
         ...,
         description="A 10-digit mobile number (as an integer) that does not start with 0.",
         examples=[9876543210]
@@ -36,64 +49,18 @@ class UserCreate(BaseModel):
         examples=["ver_abc123def456"]
     )
 
-    @field_validator('mobile_number')
-    def validate_mobile_number(cls, v):
-        """Validate that mobile number is exactly 10 digits"""
-        if not isinstance(v, int):
-            raise ValueError('Mobile number must be an integer')
-        
-        mobile_str = str(v)
-        
-        if not mobile_str.isdigit() or len(mobile_str) != 10:
-            raise ValueError('Mobile number must be exactly 10 digits')
-        
-        if mobile_str.startswith('0'):
-            raise ValueError('Mobile number cannot start with 0')
-        
-        return v
-
 #####################################################################################################
 ########## OTPRequest ###############################################################################
 
 class OTPRequest(BaseModel):
-    mobile_number: int
-    
-    @field_validator('mobile_number')
-    def validate_mobile_number(cls, v):
-        if not isinstance(v, int):
-            raise ValueError('Mobile number must be an integer')
-        
-        mobile_str = str(v)
-        
-        if not mobile_str.isdigit() or len(mobile_str) != 10:
-            raise ValueError('Mobile number must be exactly 10 digits')
-        
-        if mobile_str.startswith('0'):
-            raise ValueError('Mobile number cannot start with 0')
-        
-        return v
+    mobile_number: MobileNumber
 
 ########################################################################################################################
 ############ Verify user data ##########################################################################################
 
 class OTPVerify(BaseModel):
-    mobile_number: int
+    mobile_number: MobileNumber
     otp_code: str
-    
-    @field_validator('mobile_number')
-    def validate_mobile_number(cls, v):
-        if not isinstance(v, int):
-            raise ValueError('Mobile number must be an integer')
-        
-        mobile_str = str(v)
-        
-        if not mobile_str.isdigit() or len(mobile_str) != 10:
-            raise ValueError('Mobile number must be exactly 10 digits')
-        
-        if mobile_str.startswith('0'):
-            raise ValueError('Mobile number cannot start with 0')
-        
-        return v
 
 ####################################################################################################################
 ############## user update request #################################################################################
@@ -114,7 +81,7 @@ class UserUpdate(BaseModel):
         description="The user's password. Optional, provide to update.",
         examples=["newpassword123"]
     )
-    mobile_number: Optional[int] = Field(
+    mobile_number: Optional[MobileNumber] = Field(
         None,
         description="A 10-digit mobile number (as an integer) that does not start with 0. Optional, provide to update.",
         examples=[9876543210]
@@ -125,24 +92,14 @@ class UserUpdate(BaseModel):
         examples=["john.doe@example.com"]
     )
 
-    @field_validator('mobile_number')
-    def validate_mobile_number(cls, v):
-        """Validate that mobile number is exactly 10 digits if provided"""
-        if v is None:
-            return v
-        
-        if not isinstance(v, int):
-            raise ValueError('Mobile number must be an integer')
-        
-        mobile_str = str(v)
-        
-        if not mobile_str.isdigit() or len(mobile_str) != 10:
-            raise ValueError('Mobile number must be exactly 10 digits')
-        
-        if mobile_str.startswith('0'):
-            raise ValueError('Mobile number cannot start with 0')
-        
-        return v
+#############################################################################################################################
+#################### projection that only reads back _id, for existence checks ##############################################
+
+class UserIdOnly(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+
+    class Settings:
+        projection = {"_id": 1}
 
 #############################################################################################################################
 #################### user response ##########################################################################################
@@ -158,48 +115,69 @@ class UserResponse(BaseModel):
     is_active: bool
     is_phone_verified: bool 
 
+    @classmethod
+    def from_user(cls, user) -> "UserResponse":
+        """Build the response from a stored user, skipping re-validation of trusted data"""
+        return cls.model_construct(
+            id=str(user.id),
+            first_name=user.first_name,
+            last_name=user.last_name,
+            mobile_number=user.mobile_number,
+            email_address=user.email_address,
+            created_at=user.created_at,
+            updated_at=user.updated_at,
+            is_active=user.is_active,
+            is_phone_verified=user.is_phone_verified
+        )
+
 ###############################################################################################################################
 ############## user login request #############################################################################################
 
-class UserLogin(BaseModel):
-    identifier: Union[EmailStr, int] = Field(
+class EmailLogin(BaseModel):
+    # Users field the identifier is matched against
+    lookup_field: ClassVar[str] = "email_address"
+
+    login_type: Literal["email"] = Field(
+        ...,
+        description="The type of login. 'email' logs in with an email address.",
+        examples=["email"]
+    )
+    identifier: EmailStr = Field(
         ...,
-        description="The user's email address or phone number. Use an email address if `login_type` is 'email', or a 10-digit phone number (as an integer) if `login_type` is 'phone'.",
-        examples=["user@example.com", 9876543210]
+        description="The user's email address.",
+        examples=["user@example.com"]
     )
     password: str = Field(
         ...,
         description="The user's password.",
         examples=["securepassword123"]
     )
-    login_type: str = Field(
+
+
+class PhoneLogin(BaseModel):
+    # Users field the identifier is matched against
+    lookup_field: ClassVar[str] = "mobile_number"
+
+    login_type: Literal["phone"] = Field(
         ...,
-        description="The type of login. Must be either 'email' or 'phone'.",
-        examples=["email", "phone"]
-    )
-
-    @field_validator('identifier')
-    def validate_identifier(cls, v, info):
-        login_type = info.data.get('login_type')
-        
-        if login_type == "phone":
-            if not isinstance(v, int):
-                raise ValueError('Phone number must be an integer')
-            
-            mobile_str = str(v)
-            
-            if not mobile_str.isdigit() or len(mobile_str) != 10:
-                raise ValueError('Mobile number must be exactly 10 digits')
-            
-            if mobile_str.startswith('0'):
-                raise ValueError('Mobile number cannot start with 0')
-        
-        elif login_type == "email":
-            if not isinstance(v, str) or '@' not in str(v):
-                raise ValueError('Invalid email format')
-        
-        return v
-    
+        description="The type of login. 'phone' logs in with a 10-digit phone number.",
+        examples=["phone"]
+    )
+    identifier: MobileNumber = Field(
+        ...,
+        description="The user's 10-digit phone number (as an integer).",
+        examples=[9876543210]
+    )
+    password: str = Field(
+        ...,
+        description="The user's password.",
+        examples=["securepassword123"]
+    )
+
+
+# login_type picks the branch, so only that branch's identifier is validated
+UserLogin = Annotated[Union[EmailLogin, PhoneLogin], Field(discriminator="login_type")]
+
 #####################################################################################################################################
 ########## user login response #######################################################################################################
 
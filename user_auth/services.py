@@ -1,25 +1,40 @@
 ############## SMS OTP with Twilio ######################################### 
 
+import asyncio
+import logging
 import secrets
 import time
+from datetime import datetime, timezone
 from typing import Optional, List
+from beanie import UpdateResponse
+from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from twilio.http.http_client import TwilioHttpClient
 from twilio.rest import Client
 
-from user_auth.helper import generate_otp
-from .models import PhoneVerification, Users, OTPStore
+from user_auth.helper import active_user_cache, generate_otp, hash_otp
+from .models import PhoneVerification, Users, OTPStore, OTPRateLimit
 from .schemas import (
     PhoneVerificationResponse, UserCreate, UserUpdate, UserResponse, UserLogin, 
-    UserLoginResponse, OTPRequest, OTPVerify, OTPResponse
+    UserLoginResponse, OTPRequest, OTPVerify, OTPResponse, UserIdOnly
 )
 from fastapi import HTTPException, status
 from config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 
 
 ############################################################################################################
 ###########  Initialize Twilio client ######################################################################
 
-twilio_client = Client(settings.twilio_account_sid, settings.twilio_auth_token)
+# One pooled keep-alive session for every send; the timeout bounds how long a worker thread can hang on Twilio
+twilio_client = Client(
+    settings.twilio_account_sid,
+    settings.twilio_auth_token,
+    http_client=TwilioHttpClient(pool_connections=True, max_retries=1, timeout=5)
+)
 
 #############################################################################################################
 ############### function that send the OTP to all peoples ####################################################
@@ -28,38 +43,57 @@ async def send_sms(mobile_number: int, message: str) -> bool:
     """Send SMS using Twilio service"""
     try:
         phone_number = f"+91{mobile_number}"
-        message = twilio_client.messages.create(
+        # the Twilio client is blocking HTTP, so it runs in a worker thread to keep the event loop free
+        message = await asyncio.to_thread(
+            twilio_client.messages.create,
             body=message,
             from_=settings.twilio_phone_number,
             to=phone_number
         )
-        print(f"SMS sent successfully to {phone_number}. Message SID: {message.sid}")
+        logger.info("SMS sent to %s, message SID %s", phone_number, message.sid)
         return True
-    except Exception as e:
-        print(f"Failed to send SMS to {mobile_number}: {str(e)}")
+    except Exception:
+        logger.exception("Failed to send SMS to %s", mobile_number)
         return False
 
+# Wrong codes allowed per OTP before it is burned
+MAX_OTP_ATTEMPTS = 3
+
+# Seconds a number has to wait between OTP sends
+OTP_RESEND_SECONDS = 60
+
+# Hash of a random password nobody knows, verified against when a login names no user
+_DUMMY_PASSWORD_HASH = Users.hash_password_static(secrets.token_urlsafe(16))
+
+_SMS_TEMPLATE = "Your OTP for phone verification is: %s. Valid for 5 minutes. Do not share this OTP with anyone."
+
 ###################################################################################################################
 ################## This function will send OTP to the mobile number ###############################################
 
 async def send_otp(otp_request: OTPRequest) -> OTPResponse:
     """Send OTP to mobile number for verification"""
     
-    # Check if user already exists with this mobile number
-    existing_user = await Users.find_one(Users.mobile_number == otp_request.mobile_number)
+    # Check if user already exists with this mobile number; only the _id comes back
+    existing_user = await Users.find_one(Users.mobile_number == otp_request.mobile_number).project(UserIdOnly)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="User with this mobile number already exists"
         )
     
-    # Check for recent OTP requests (rate limiting)
-    recent_otp = await OTPStore.find_one({
-        "mobile_number": otp_request.mobile_number,
-        "created_at": {"$gte": int(time.time()) - 60}
-    })
-    
-    if recent_otp:
+    # Rate limit: claim the number's send slot unless it was claimed in the last 60 seconds.
+    # A fresh row misses the filter, so the upsert tries to insert and hits the unique index.
+    now = int(time.time())
+    try:
+        await OTPRateLimit.get_motor_collection().update_one(
+            {"mobile_number": otp_request.mobile_number, "created_at": {"$lte": now - OTP_RESEND_SECONDS}},
+            {"$set": {
+                "created_at": now,
+                "purge_at": datetime.fromtimestamp(now + OTP_RESEND_SECONDS, tz=timezone.utc)
+            }},
+            upsert=True
+        )
+    except DuplicateKeyError:
         raise HTTPException(
             status_code=status.HTTP_429_TOO_MANY_REQUESTS,
             detail="Please wait before requesting another OTP"
@@ -67,22 +101,37 @@ async def send_otp(otp_request: OTPRequest) -> OTPResponse:
     
     # Generate OTP
     otp_code = generate_otp()
-    expires_at = int(time.time()) + 300  # 5 minutes expiry
+    expires_at = now + 300  # 5 minutes expiry
+    
+    # Burn any earlier unused OTP for the number, so a guess can only ever match one live code
+    await OTPStore.find({
+        "mobile_number": otp_request.mobile_number,
+        "is_used": False
+    }).update({"$set": {"is_used": True}})
     
     # Store OTP
     otp_record = OTPStore(
         mobile_number=otp_request.mobile_number,
-        otp_code=otp_code,
-        expires_at=expires_at
+        otp_hash=hash_otp(otp_code),
+        created_at=now,
+        expires_at=expires_at,
+        purge_at=datetime.fromtimestamp(expires_at, tz=timezone.utc)
     )
     await otp_record.insert()
     
     # Send SMS via Twilio
-    sms_message = f"Your OTP for phone verification is: {otp_code}. Valid for 5 minutes. Do not share this OTP with anyone."
+    sms_message = _SMS_TEMPLATE % otp_code
     sms_sent = await send_sms(otp_request.mobile_number, sms_message)
     
     if not sms_sent:
-        await otp_record.delete()
+        # Release the send slot too, so the user can retry straight away; matching created_at
+        # leaves a slot claimed by a later request alone
+        await asyncio.gather(
+            otp_record.delete(),
+            OTPRateLimit.get_motor_collection().delete_one(
+                {"mobile_number": otp_request.mobile_number, "created_at": now}
+            )
+        )
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to send OTP. Please try again."
@@ -99,56 +148,67 @@ async def send_otp(otp_request: OTPRequest) -> OTPResponse:
 async def verify_phone_otp(otp_verify: OTPVerify) -> PhoneVerificationResponse:
     """Verify OTP and mark phone as verified"""
     
-    # Find valid OTP
+    # one clock read per request keeps every expiry check and timestamp consistent
+    now = int(time.time())
+    
+    # A correct, unexpired OTP is matched on its hash and consumed in one atomic step
     otp_record = await OTPStore.find_one({
         "mobile_number": otp_verify.mobile_number,
+        "otp_hash": hash_otp(otp_verify.otp_code),
         "is_used": False,
-        "expires_at": {"$gt": int(time.time())}
-    })
+        "expires_at": {"$gt": now},
+        "attempts": {"$lt": MAX_OTP_ATTEMPTS}
+    }).update({"$set": {"is_used": True}}, response_type=UpdateResponse.NEW_DOCUMENT)
     
     if not otp_record:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid or expired OTP"
-        )
-    
-    # Check attempts
-    if otp_record.attempts >= 3:
-        await otp_record.update({"$set": {"is_used": True}})
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Too many failed attempts. Please request a new OTP."
+        # Wrong code: count the attempt and burn the OTP on the last one, atomically in one step
+        active_otp = await OTPStore.get_motor_collection().find_one_and_update(
+            {
+                "mobile_number": otp_verify.mobile_number,
+                "is_used": False,
+                "expires_at": {"$gt": now}
+            },
+            [{"$set": {
+                "attempts": {"$add": ["$attempts", 1]},
+                "is_used": {"$gte": [{"$add": ["$attempts", 1]}, MAX_OTP_ATTEMPTS]}
+            }}],
+            return_document=ReturnDocument.AFTER
         )
-    
-    # Verify OTP
-    if otp_record.otp_code != otp_verify.otp_code:
-        await otp_record.update({"$inc": {"attempts": 1}})
-        remaining = 3 - (otp_record.attempts + 1)
+        
+        if not active_otp:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid or expired OTP"
+            )
+        
+        remaining = MAX_OTP_ATTEMPTS - active_otp["attempts"]
+        if remaining <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Too many failed attempts. Please request a new OTP."
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Invalid OTP. {remaining} attempts remaining."
         )
     
-    # Mark OTP as used
-    await otp_record.update({"$set": {"is_used": True}})
-    
     # Generate verification token
     verification_token = f"ver_{secrets.token_urlsafe(32)}"
     
-    # Store phone verification
-    phone_verification = PhoneVerification(
-        mobile_number=otp_verify.mobile_number,
-        verification_token=verification_token,
-        expires_at=int(time.time()) + 3600  # Valid for 1 hour
+    # Store phone verification, replacing any earlier one for this number in the same write
+    expires_at = now + 3600  # Valid for 1 hour
+    await PhoneVerification.get_motor_collection().update_one(
+        {"mobile_number": otp_verify.mobile_number},
+        {"$set": {
+            "verification_token": verification_token,
+            "verified_at": now,
+            "expires_at": expires_at,
+            "purge_at": datetime.fromtimestamp(expires_at, tz=timezone.utc),
+            "is_used": False
+        }},
+        upsert=True
     )
     
-    # Remove any existing verification for this number
-    await PhoneVerification.find({
-        "mobile_number": otp_verify.mobile_number
-    }).delete()
-    
-    await phone_verification.insert()
-    
     return PhoneVerificationResponse(
         message="Phone number verified successfully",
         mobile_number=otp_verify.mobile_number,
@@ -162,13 +222,24 @@ async def verify_phone_otp(otp_verify: OTPVerify) -> PhoneVerificationResponse:
 async def register_verified_user(user_data: UserCreate) -> UserResponse:
     """Register user with verified phone number"""
     
-    # Check if phone verification exists and is valid
-    phone_verification = await PhoneVerification.find_one({
-        "mobile_number": user_data.mobile_number,
-        "verification_token": user_data.verification_token,
-        "expires_at": {"$gt": int(time.time())},
-        "is_used": False
-    })
+    # one clock read per request keeps every expiry check and timestamp consistent
+    now = int(time.time())
+    
+    # The verification lookup and the duplicate check are independent, so they share one round-trip
+    phone_verification, existing_user = await asyncio.gather(
+        PhoneVerification.find_one({
+            "mobile_number": user_data.mobile_number,
+            "verification_token": user_data.verification_token,
+            "expires_at": {"$gt": now},
+            "is_used": False
+        }),
+        Users.find_one(
+            {"$or": [
+                {"email_address": user_data.email_address},
+                {"mobile_number": user_data.mobile_number}
+            ]}
+        ).project(UserIdOnly)
+    )
     
     if not phone_verification:
         raise HTTPException(
@@ -176,14 +247,6 @@ async def register_verified_user(user_data: UserCreate) -> UserResponse:
             detail="Invalid or expired phone verification. Please verify your phone number again."
         )
     
-    # Check for existing user with email or mobile
-    existing_user = await Users.find_one(
-        {"$or": [
-            {"email_address": user_data.email_address},
-            {"mobile_number": user_data.mobile_number}
-        ]}
-    )
-    
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -194,29 +257,26 @@ async def register_verified_user(user_data: UserCreate) -> UserResponse:
     user = Users(
         first_name=user_data.first_name,
         last_name=user_data.last_name,
-        password=Users.hash_password_static(user_data.password),
+        password=await Users.hash_password_async(user_data.password),
         mobile_number=user_data.mobile_number,
         email_address=user_data.email_address,
-        created_at=int(time.time()),
+        created_at=now,
         is_phone_verified=True
     )
     
-    await user.insert()
+    # The unique indexes catch a concurrent registration that passed the check above
+    try:
+        await user.insert()
+    except DuplicateKeyError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="User with this email or mobile number already exists"
+        )
     
     # Mark phone verification as used
     await phone_verification.update({"$set": {"is_used": True}})
     
-    return UserResponse(
-        id=str(user.id),
-        first_name=user.first_name,
-        last_name=user.last_name,
-        mobile_number=user.mobile_number,
-        email_address=user.email_address,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        is_active=user.is_active,
-        is_phone_verified=user.is_phone_verified
-    )
+    return UserResponse.from_user(user)
 
 #############################################################################################################################
 ################# Login only authenticate user ##############################################################################
@@ -226,34 +286,20 @@ async def register_verified_user(user_data: UserCreate) -> UserResponse:
 async def login_user(login_data: UserLogin) -> UserLoginResponse:
     """Authenticate user login with email or phone"""
     
-    # Build query based on login type
-    if login_data.login_type == "email":
-        query = {
-            "email_address": login_data.identifier,
-            "is_active": True
-        }
-    elif login_data.login_type == "phone":
-        query = {
-            "mobile_number": login_data.identifier,
-            "is_active": True
-        }
-    else:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid login type. Use 'email' or 'phone'"
-        )
+    # The login variant names the Users field its identifier is matched against
+    query = {
+        login_data.lookup_field: login_data.identifier,
+        "is_active": True
+    }
     
     # Find user
     user = await Users.find_one(query)
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid credentials"
-        )
-    
-    # Verify password
-    if not user.verify_password(login_data.password):
+    # Unknown users are checked against a throwaway hash so both branches take one bcrypt verify
+    password_ok = await Users.verify_hash_async(
+        login_data.password, user.password if user else _DUMMY_PASSWORD_HASH
+    )
+    if not user or not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
@@ -264,17 +310,7 @@ async def login_user(login_data: UserLogin) -> UserLoginResponse:
     
     return UserLoginResponse(
         message="Login successful",
-        user=UserResponse(
-            id=str(user.id),
-            first_name=user.first_name,
-            last_name=user.last_name,
-            mobile_number=user.mobile_number,
-            email_address=user.email_address,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            is_active=user.is_active,
-            is_phone_verified=user.is_phone_verified
-        ),
+        user=UserResponse.from_user(user),
         login_time=login_time
     )
 
@@ -290,17 +326,7 @@ async def get_user_by_id(user_id: str) -> Optional[UserResponse]:
     except:
         return None
     
-    return UserResponse(
-        id=str(user.id),
-        first_name=user.first_name,
-        last_name=user.last_name,
-        mobile_number=user.mobile_number,
-        email_address=user.email_address,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        is_active=user.is_active,
-        is_phone_verified=user.is_phone_verified
-    )
+    return UserResponse.from_user(user)
 
 ########################################################################################################################
 ############ update the user ###########################################################################################
@@ -314,9 +340,9 @@ async def update_user(user_id: str, user_data: UserUpdate) -> Optional[UserRespo
     except:
         return None
     
-    # Check for duplicate email/mobile if they're being updated
+    # Check for duplicate email/mobile if they're being updated; only the _id comes back
     if user_data.email_address and user_data.email_address != user.email_address:
-        existing_user = await Users.find_one(Users.email_address == user_data.email_address)
+        existing_user = await Users.find_one(Users.email_address == user_data.email_address).project(UserIdOnly)
         if existing_user and str(existing_user.id) != user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -324,44 +350,35 @@ async def update_user(user_id: str, user_data: UserUpdate) -> Optional[UserRespo
             )
     
     if user_data.mobile_number and user_data.mobile_number != user.mobile_number:
-        existing_user = await Users.find_one(Users.mobile_number == user_data.mobile_number)
+        existing_user = await Users.find_one(Users.mobile_number == user_data.mobile_number).project(UserIdOnly)
         if existing_user and str(existing_user.id) != user_id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User with this mobile number already exists"
             )
     
-    # Update fields
-    update_data = {}
-    if user_data.first_name is not None:
-        update_data["first_name"] = user_data.first_name
-    if user_data.last_name is not None:
-        update_data["last_name"] = user_data.last_name
-    if user_data.password is not None:
-        update_data["password"] = Users.hash_password_static(user_data.password)
-    if user_data.mobile_number is not None:
-        update_data["mobile_number"] = user_data.mobile_number
+    # Only the fields the client actually sent
+    update_data = user_data.model_dump(exclude_unset=True, exclude_none=True)
+    if "password" in update_data:
+        update_data["password"] = await Users.hash_password_async(update_data["password"])
+    if "mobile_number" in update_data:
         # If mobile number is updated, mark as not verified
         update_data["is_phone_verified"] = False
-    if user_data.email_address is not None:
-        update_data["email_address"] = user_data.email_address
     
     if update_data:
         update_data["updated_at"] = int(time.time())
-        await user.update({"$set": update_data})
-        user = await Users.get(user_id)
+        # set() issues the $set and updates the local copy, so nothing is read back.
+        # The unique indexes catch a concurrent change that passed the checks above
+        try:
+            await user.set(update_data)
+        except DuplicateKeyError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="User with this email or mobile number already exists"
+            )
+        active_user_cache.pop(user_id, None)
     
-    return UserResponse(
-        id=str(user.id),
-        first_name=user.first_name,
-        last_name=user.last_name,
-        mobile_number=user.mobile_number,
-        email_address=user.email_address,
-        created_at=user.created_at,
-        updated_at=user.updated_at,
-        is_active=user.is_active,
-        is_phone_verified=user.is_phone_verified
-    )
+    return UserResponse.from_user(user)
 
 ###############################################################################################################
 ################ delete user as soft delete as is_active : false ##############################################
@@ -375,32 +392,36 @@ async def delete_user(user_id: str) -> bool:
     except:
         return False
     
-    await user.update({"$set": {
-        "is_active": False,
-        "updated_at": int(time.time())
-    }})
+    await user.set({"is_active": False, "updated_at": int(time.time())})
+    active_user_cache.pop(user_id, None)
     
     return True
 
 ########################################################################################################################
 ####################### get all the users ###############################################################################
 
-async def get_all_users() -> List[UserResponse]:
-    """Get all active users"""
-    users = await Users.find(Users.is_active == True).to_list()
+# Fields of UserResponse as stored on Users (the password hash is never read back)
+_USER_RESPONSE_PROJECTION = {
+    "first_name": 1, "last_name": 1, "mobile_number": 1, "email_address": 1,
+    "created_at": 1, "updated_at": 1, "is_active": 1, "is_phone_verified": 1
+}
+
+async def get_all_users(limit: int = 100, after_id: Optional[str] = None) -> List[UserResponse]:
+    """Get one page of active users, keyed on _id so later pages cost the same as the first"""
+    query = {"is_active": True}
+    if after_id is not None:
+        if not ObjectId.is_valid(after_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid after_id"
+            )
+        query["_id"] = {"$gt": ObjectId(after_id)}
     
+    # Raw documents without the password hash; they were validated on write, so skip re-validation
+    cursor = Users.get_motor_collection().find(query, _USER_RESPONSE_PROJECTION).sort("_id", 1).limit(limit)
     return [
-        UserResponse(
-            id=str(user.id),
-            first_name=user.first_name,
-            last_name=user.last_name,
-            mobile_number=user.mobile_number,
-            email_address=user.email_address,
-            created_at=user.created_at,
-            updated_at=user.updated_at,
-            is_active=user.is_active,
-            is_phone_verified=user.is_phone_verified
-        ) for user in users
+        UserResponse.model_construct(id=str(doc.pop("_id")), **doc)
+        async for doc in cursor
     ]
 
 #############################################################################################################################
\ No newline at end of file